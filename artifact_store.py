@@ -0,0 +1,194 @@
+import os
+from collections import namedtuple
+import pandas as pd
+
+# Key of a single artifact of the experiment sweep. `algorithm` is None for the
+# missing data produced by the removal stage and the algorithm name for imputed results.
+ArtifactKey = namedtuple('ArtifactKey', ['dataset', 'combination', 'feature_set', 'percentage', 'seed', 'algorithm'])
+
+# Key columns prepended to every frame in the columnar container (prefixed so they never clash with data columns)
+KEY_COLUMNS = ['_feature_set', '_percentage', '_seed', '_algorithm']
+
+DEFAULT_BACKEND = 'parquet'
+
+
+class ExcelStore:
+    """
+    Legacy layout with one Excel file per experiment cell:
+    removed_data/<dataset>/<combination>/<feature_set>/<percentage>/seed<seed>/missing_data.xlsx and
+    impute_algos_result/<dataset>/<combination>/<feature_set>/<percentage>/seed<seed>/result_data_<algorithm>.xlsx
+    """
+    def __init__(self, base_dir):
+        self.base_dir = base_dir
+
+    def path(self, key):
+        stage_dir = 'removed_data' if key.algorithm is None else 'impute_algos_result'
+        file_name = 'missing_data.xlsx' if key.algorithm is None else f'result_data_{key.algorithm}.xlsx'
+        return os.path.join(self.base_dir, stage_dir, key.dataset, key.combination, key.feature_set,
+                            str(key.percentage), f'seed{key.seed}', file_name)
+
+    def save(self, key, df):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        df.to_excel(path, index=False)
+
+    def load(self, key):
+        return pd.read_excel(self.path(key))
+
+    def exists(self, key):
+        return os.path.exists(self.path(key))
+
+    def keys(self, dataset, results=False):
+        """
+        Lists keys of all artifacts of a dataset found on disk.
+
+        Params:
+        dataset (str): dataset type, e.g. bird or terrestrial_mammals.
+        results (bool): list imputed results instead of missing data.
+        """
+        stage_dir = 'impute_algos_result' if results else 'removed_data'
+        dataset_dir = os.path.join(self.base_dir, stage_dir, dataset)
+        keys = []
+        for subdir, _, files in os.walk(dataset_dir):
+            parts = os.path.relpath(subdir, dataset_dir).split(os.sep)
+            if len(parts) != 4 or not parts[3].startswith('seed'):
+                continue
+            combination, feature_set, percentage, seed = parts
+            for file in sorted(files):
+                if results and file.startswith('result_data_') and file.endswith('.xlsx'):
+                    algorithm = file[len('result_data_'):-len('.xlsx')]
+                elif not results and file == 'missing_data.xlsx':
+                    algorithm = None
+                else:
+                    continue
+                keys.append(ArtifactKey(dataset, combination, feature_set, int(percentage), int(seed[len('seed'):]), algorithm))
+        return sorted(keys, key=_sort_key)
+
+    def flush(self):
+        pass
+
+
+class ParquetStore:
+    """
+    Columnar layout with one Parquet file per (dataset, combination, stage):
+    artifacts/<dataset>/<combination>_missing.parquet and artifacts/<dataset>/<combination>_results.parquet.
+    Every cell is stored as a block of rows tagged with the key columns. Saved frames are buffered
+    in memory and written on `flush()`, so a whole stage produces a handful of files.
+    """
+    def __init__(self, base_dir):
+        # Fail early instead of at the end of a sweep when no parquet engine is installed
+        pd.io.parquet.get_engine('auto')
+        self.root = os.path.join(base_dir, 'artifacts')
+        self._pending = {}
+        self._cache = {}
+
+    def path(self, dataset, combination, results):
+        stage = 'results' if results else 'missing'
+        return os.path.join(self.root, dataset, f'{combination}_{stage}.parquet')
+
+    def _container(self, dataset, combination, results):
+        """Returns the cells of one container as a dict of key -> DataFrame, reading the file at most once."""
+        path = self.path(dataset, combination, results)
+        if path not in self._cache:
+            cells = {}
+            if os.path.exists(path):
+                table = pd.read_parquet(path)
+                for (feature_set, percentage, seed, algorithm), block in table.groupby(KEY_COLUMNS, sort=False):
+                    key = ArtifactKey(dataset, combination, feature_set, int(percentage), int(seed), algorithm or None)
+                    cells[key] = block.drop(columns=KEY_COLUMNS).reset_index(drop=True)
+            self._cache[path] = cells
+        return self._cache[path]
+
+    def save(self, key, df):
+        results = key.algorithm is not None
+        self._container(key.dataset, key.combination, results)[key] = df.reset_index(drop=True)
+        self._pending[self.path(key.dataset, key.combination, results)] = (key.dataset, key.combination, results)
+
+    def load(self, key):
+        return self._container(key.dataset, key.combination, key.algorithm is not None)[key].copy()
+
+    def exists(self, key):
+        return key in self._container(key.dataset, key.combination, key.algorithm is not None)
+
+    def keys(self, dataset, results=False):
+        """
+        Lists keys of all artifacts of a dataset, including those not flushed yet.
+
+        Params:
+        dataset (str): dataset type, e.g. bird or terrestrial_mammals.
+        results (bool): list imputed results instead of missing data.
+        """
+        stage = 'results' if results else 'missing'
+        combinations = set()
+        dataset_dir = os.path.join(self.root, dataset)
+        if os.path.isdir(dataset_dir):
+            for file in os.listdir(dataset_dir):
+                if file.endswith(f'_{stage}.parquet'):
+                    combinations.add(file[:-len(f'_{stage}.parquet')])
+        for pending_dataset, combination, pending_results in self._pending.values():
+            if pending_dataset == dataset and pending_results == results:
+                combinations.add(combination)
+        keys = []
+        for combination in combinations:
+            keys.extend(self._container(dataset, combination, results))
+        return sorted(keys, key=_sort_key)
+
+    def flush(self):
+        """Writes every container that received new cells since the last flush."""
+        for path, (dataset, combination, results) in self._pending.items():
+            cells = self._container(dataset, combination, results)
+            blocks = []
+            for key, df in cells.items():
+                block = df.copy()
+                block.insert(0, '_algorithm', key.algorithm or '')
+                block.insert(0, '_seed', key.seed)
+                block.insert(0, '_percentage', key.percentage)
+                block.insert(0, '_feature_set', key.feature_set)
+                blocks.append(block)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            pd.concat(blocks, ignore_index=True).to_parquet(path, index=False)
+        self._pending = {}
+
+
+STORE_BACKENDS = {
+    'excel': ExcelStore,
+    'parquet': ParquetStore,
+}
+
+
+def _sort_key(key):
+    return (key.combination, len(key.feature_set), key.feature_set, key.percentage, key.seed, key.algorithm or '')
+
+
+def open_store(base_dir, backend=DEFAULT_BACKEND):
+    """
+    Opens artifact store of the given backend rooted at the data_impute_project directory.
+
+    Params:
+    base_dir (str): path of the data_impute_project directory.
+    backend (str): one of the keys of STORE_BACKENDS.
+    """
+    if backend not in STORE_BACKENDS:
+        raise ValueError(f"Unknown storage backend '{backend}'. Choose from {list(STORE_BACKENDS)}.")
+    return STORE_BACKENDS[backend](base_dir)
+
+
+def copy_artifacts(source, target, dataset, results=None):
+    """
+    Copies all artifacts of a dataset from one store into another, e.g. to export the columnar
+    store into the legacy Excel tree as a final report step or to import an existing Excel tree.
+
+    Params:
+    source: store to read from.
+    target: store to write into.
+    dataset (str): dataset type to copy.
+    results (bool): copy only missing data (False) or only imputed results (True). Copies both if None.
+    """
+    stages = [False, True] if results is None else [results]
+    count = 0
+    for stage in stages:
+        for key in source.keys(dataset, results=stage):
+            target.save(key, source.load(key))
+            count += 1
+    target.flush()
+    return count
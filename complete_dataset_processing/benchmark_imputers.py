@@ -0,0 +1,145 @@
+import os
+import sys
+import time
+import argparse
+import resource
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# Add project root to path for shared modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from artifact_store import ArtifactKey
+from imputer_registry import IMPUTERS
+from task_cache import library_versions
+from impute_algo_all_dataset import impute_task
+
+# Typical mean and standard deviation of isotope features (δ13C coll, δ15N coll, δ13C carb, δ18O carb, ...)
+isotope_profiles = [(-20.0, 1.5), (9.0, 2.0), (-12.0, 1.8), (-5.5, 1.2), (17.5, 1.0), (10.0, 4.0), (0.709, 0.002), (0.709, 0.002)]
+
+
+def synthetic_isotope_data(n_rows, n_cols, seed=0):
+    """
+    Generates isotope-like data with correlated features, like our combination files.
+
+    Params:
+    n_rows (int): number of specimens.
+    n_cols (int): number of isotope features.
+    seed (int): random seed for reproducibility of results.
+
+    return: DataFrame with ID column followed by feature columns A, B, C, ...
+    """
+    rng = np.random.default_rng(seed)
+    # Features share a few latent diet/environment factors so that they are correlated like real isotope values
+    latent = rng.standard_normal((n_rows, 3))
+    loadings = rng.uniform(-1, 1, (3, n_cols))
+    values = latent @ loadings + 0.5 * rng.standard_normal((n_rows, n_cols))
+    values = (values - values.mean(axis=0)) / values.std(axis=0)
+    for c in range(n_cols):
+        mean, std = isotope_profiles[c % len(isotope_profiles)]
+        values[:, c] = np.round(mean + std * values[:, c], 2)
+    columns = [chr(ord('A') + c) for c in range(n_cols)]
+    df = pd.DataFrame(values, columns=columns)
+    df.insert(0, 'ID', [f'S {i}' for i in range(n_rows)])
+    return df
+
+
+def remove_values(df, percentage, seed=0):
+    """Sets given percentage of every feature column to NaN, like the removal stage."""
+    rng = np.random.default_rng(seed)
+    missing_df = df.copy()
+    features = df.columns[1:]
+    mask = rng.random((len(df), len(features))) < percentage / 100.0
+    missing_df[features] = missing_df[features].mask(mask)
+    return missing_df, mask
+
+
+def _run_in_fresh_process(name, df, missing_df, mask):
+    """Runs one algorithm and measures its runtime and the growth of peak resident memory of the process."""
+    reference = df.iloc[:, 1:].to_numpy(dtype=float)
+    key = ArtifactKey('benchmark', f'synthetic_{df.shape[0]}x{df.shape[1] - 1}', ''.join(df.columns[1:]), 0, 0, None)
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start_time = time.perf_counter()
+    try:
+        _, imputed_df = impute_task(key, name, missing_df, reference)
+        status = 'ok'
+    except MemoryError:
+        imputed_df, status = None, 'out of memory'
+    seconds = time.perf_counter() - start_time
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    mae = np.abs(imputed_df.iloc[:, 1:].to_numpy(dtype=float) - reference)[mask].mean() if imputed_df is not None else np.nan
+    return {'Seconds': seconds, 'PeakMemoryMB': (peak_kb - baseline_kb) / 1024, 'MAE': mae, 'Status': status}
+
+
+def benchmark(name, df, missing_df, mask):
+    """
+    Times one algorithm on one synthetic table in a fresh worker process, so that peak memory is not
+    inflated by previous runs and caches (e.g. neighbour indexes) are not shared between runs.
+
+    return: dict with runtime in seconds, peak memory growth in MB, MAE of the removed values and status.
+    """
+    start_time = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            return executor.submit(_run_in_fresh_process, name, df, missing_df, mask).result()
+    except BrokenProcessPool:
+        # Worker was killed, usually by the operating system running out of memory
+        return {'Seconds': time.perf_counter() - start_time, 'PeakMemoryMB': np.nan, 'MAE': np.nan, 'Status': 'killed'}
+
+
+def compare_with_previous(results, previous, tolerance):
+    """Prints runtime of each configuration relative to its last recorded run and flags regressions."""
+    config = ['Algorithm', 'Rows', 'Columns', 'Percentage']
+    latest = previous.sort_values('Timestamp').groupby(config).tail(1)
+    merged = results.merge(latest[config + ['Seconds']], on=config, how='left', suffixes=('', ' (previous)'))
+    for _, row in merged.dropna(subset=['Seconds (previous)']).iterrows():
+        ratio = row['Seconds'] / row['Seconds (previous)']
+        flag = '  <-- regression' if ratio > tolerance else ''
+        print(f"{row['Algorithm']:<18} {row['Rows']:>8} x {row['Columns']:<3} {row['Seconds']:9.2f}s  {ratio:5.2f}x previous{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark imputation algorithms on synthetic isotope-like data.")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000], help="table sizes, e.g. 1000 10000 100000 1000000")
+    parser.add_argument('--cols', type=int, nargs='+', default=[4, 9], help="numbers of feature columns, 4 to 20")
+    parser.add_argument('--percentage', type=int, default=15, help="percentage of values removed per column")
+    parser.add_argument('--algorithms', nargs='+', default=list(IMPUTERS), choices=list(IMPUTERS))
+    parser.add_argument('--time-budget', type=float, default=600.0,
+                        help="skip larger tables for an algorithm once it took longer than this many seconds")
+    parser.add_argument('--output', default=os.path.join("..", "data_impute_project", "benchmarks", "benchmark_results.csv"))
+    parser.add_argument('--tolerance', type=float, default=1.25, help="runtime ratio to previous run reported as regression")
+    args = parser.parse_args()
+
+    results = []
+    timestamp = datetime.now().isoformat(timespec='seconds')
+    versions = library_versions()
+    for n_cols in args.cols:
+        over_budget = set()
+        for n_rows in sorted(args.rows):
+            df = synthetic_isotope_data(n_rows, n_cols)
+            missing_df, mask = remove_values(df, args.percentage)
+            for name in args.algorithms:
+                if name in over_budget:
+                    print(f"Skipping {name} on {n_rows} x {n_cols}, over time budget on a smaller table")
+                    continue
+                result = benchmark(name, df, missing_df, mask)
+                print(f"{name:<18} {n_rows:>8} x {n_cols:<3} {result['Seconds']:9.2f}s  {result['PeakMemoryMB']:9.1f} MB  MAE {result['MAE']:.4f}  {result['Status']}")
+                if result['Seconds'] > args.time_budget or result['Status'] != 'ok':
+                    over_budget.add(name)
+                results.append({'Timestamp': timestamp, 'Algorithm': name, 'Rows': n_rows, 'Columns': n_cols,
+                                'Percentage': args.percentage, **result, **versions})
+
+    results_df = pd.DataFrame(results)
+    if os.path.exists(args.output):
+        previous = pd.read_csv(args.output)
+        compare_with_previous(results_df, previous, args.tolerance)
+        results_df = pd.concat([previous, results_df], ignore_index=True)
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    results_df.to_csv(args.output, index=False)
+    print(f"Benchmark results saved to: {args.output}")
+
+if __name__ == "__main__":
+    main()
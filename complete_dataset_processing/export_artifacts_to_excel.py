@@ -0,0 +1,33 @@
+import os
+import sys
+import time
+
+# Add project root to path for shared modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from artifact_store import DEFAULT_BACKEND, copy_artifacts, open_store
+from mask_registry import MaskRegistry, export_missing_data
+
+# List of valid datasets
+datasets = ["bird", "fish", "human", "mammals_without_humans", "marine_mammals",
+            "terr_herb_and_marine_mammals", "terrestrial_herbivorous_mammals", "terrestrial_mammals"]
+
+# Prompt user for dataset type
+dataset_type = input(f"Enter the dataset type {datasets}: ").strip()
+
+if dataset_type not in datasets:
+    raise ValueError("Invalid dataset type entered. Please try again.")
+
+base_dir = os.path.join("..", "data_impute_project")
+
+# Start the timer
+start_time = time.time()
+
+# Write the masked missing data and the columnar results back into the
+# removed_data / impute_algos_result Excel tree for reporting
+excel_store = open_store(base_dir, 'excel')
+count = export_missing_data(MaskRegistry.open(base_dir, dataset_type), excel_store)
+count += copy_artifacts(open_store(base_dir, DEFAULT_BACKEND), excel_store, dataset_type, results=True)
+
+end_time = time.time()
+print(f"Exported {count} artifacts of the {dataset_type} dataset to Excel in {end_time - start_time:.2f} seconds")
@@ -6,27 +6,6 @@ import os
 datasets = ["bird", "fish", "human", "mammals_without_humans", "marine_mammals", 
             "terr_herb_and_marine_mammals", "terrestrial_herbivorous_mammals", "terrestrial_mammals"]
 
-# Prompt user for dataset type
-dataset_type = input("Enter the dataset type (e.g., bird, fish, human, etc.): ").strip()
-
-# Verify if entered dataset type is valid
-if dataset_type not in datasets:
-    raise ValueError("Invalid dataset type entered. Please try again.")
-
-# Construct file path based on dataset type
-file_path = os.path.join("..", "data_impute_project", "error_metrics", dataset_type, 'error_analysis_with_all_featuresets.csv')
-
-# Check if the file exists
-if not os.path.exists(file_path):
-    raise FileNotFoundError(f"No error metrics file found for {dataset_type}. Please check the file path or select another dataset.")
-
-# Load CSV file
-data = pd.read_csv(file_path)
-
-# Output directory for plots
-output_dir = os.path.join("..", "data_impute_project", "mae_scatter_plots", dataset_type)
-os.makedirs(output_dir, exist_ok=True)
-
 # Define markers and colors
 markers = ['o', 's', 'D', '^', 'v', '<', '>']
 colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2']
@@ -59,6 +38,34 @@ def generate_scatter_plots(data, output_dir):
             plt.savefig(os.path.join(output_dir, plot_filename), bbox_inches='tight')
             plt.close()
 
-# Generate scatter plots for the selected dataset
-generate_scatter_plots(data, output_dir)
-print(f"Scatter plots have been created for all features of all combinations in the {dataset_type} dataset.")
+
+def generate_plots(dataset_type):
+    """Creates MAE scatter plots of every feature of every combination of a dataset from its error analysis."""
+    # Construct file path based on dataset type
+    file_path = os.path.join("..", "data_impute_project", "error_metrics", dataset_type, 'error_analysis_with_all_featuresets.csv')
+
+    # Check if the file exists
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"No error metrics file found for {dataset_type}. Please check the file path or select another dataset.")
+
+    # Load CSV file
+    data = pd.read_csv(file_path)
+
+    # Output directory for plots
+    output_dir = os.path.join("..", "data_impute_project", "mae_scatter_plots", dataset_type)
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Generate scatter plots for the selected dataset
+    generate_scatter_plots(data, output_dir)
+    print(f"Scatter plots have been created for all features of all combinations in the {dataset_type} dataset.")
+
+
+if __name__ == "__main__":
+    # Prompt user for dataset type
+    dataset_type = input("Enter the dataset type (e.g., bird, fish, human, etc.): ").strip()
+
+    # Verify if entered dataset type is valid
+    if dataset_type not in datasets:
+        raise ValueError("Invalid dataset type entered. Please try again.")
+
+    generate_plots(dataset_type)
@@ -2,133 +2,126 @@ import sys
 import os
 import pandas as pd
 import numpy as np
-from sklearn.impute import KNNImputer
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.experimental import enable_iterative_imputer
-from sklearn.impute import IterativeImputer
-from sklearn.linear_model import BayesianRidge
-from sklearn.svm import SVR
-from sklearn.preprocessing import StandardScaler
-from sklearn.impute import SimpleImputer
 import time
+import argparse
 
-# Add relative path to hybrid_KNN_RF_Impute.py
-module_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'hybrid_KNN_RF_Impute.py'))
-sys.path.append(os.path.dirname(module_path))
+# Add project root to path for shared modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from hybrid_KNN_RF_Impute import HybridKNNRandomForestImputer
+from artifact_store import open_store
+from imputer_registry import IMPUTERS, create_imputer, default_algorithms
+from mask_registry import MaskRegistry
+from sweep_scheduler import run_tasks
+from task_cache import TaskCache, task_digest, source_digest
 
 
-# Imputation functions
-def impute_with_knn(df):
-    imputer = KNNImputer(n_neighbors=10)
-    imputed_data = imputer.fit_transform(df)
-    return pd.DataFrame(imputed_data, columns=df.columns)
-
-def impute_with_random_forest_MICE(df):
-    rf_imputer = IterativeImputer(estimator=RandomForestRegressor(), max_iter=25, tol=0.05, random_state=0)
-    imputed_data = rf_imputer.fit_transform(df)
-    return pd.DataFrame(imputed_data, columns=df.columns)
-
-def impute_with_random_forest(df, n_estimators=100, max_depth=None, random_state=None):
-    df_numeric = df.select_dtypes(include=[np.number])
-    for column in df_numeric.columns:
-        not_missing = df_numeric[df_numeric[column].notna()]
-        features = not_missing.drop(columns=[column])
-        target = not_missing[column]
-        
-        model = RandomForestRegressor(n_estimators=n_estimators, max_depth=max_depth, random_state=random_state)
-        model.fit(features, target)
-        
-        missing = df_numeric[df_numeric[column].isna()]
-        if not missing.empty:
-            missing_features = missing.drop(columns=[column])
-            predicted_values = model.predict(missing_features)
-            df.loc[missing.index, column] = predicted_values
-    return df
-
-def impute_with_svm(df):
-    df_numeric = df.select_dtypes(include=[np.number])
-    scaler = StandardScaler()
-    imputer = SimpleImputer(strategy='mean')
+def impute_task(key, name, df, reference):
+    """
+    Imputes missing data of one experiment cell with one algorithm. Runs inside a worker process.
     
-    for column in df_numeric.columns:
-        not_missing = df_numeric[df_numeric[column].notna()]
-        features = not_missing.drop(columns=[column])
-        target = not_missing[column]
-        
-        features_imputed = imputer.fit_transform(features)
-        features_scaled = scaler.fit_transform(features_imputed)
-        
-        model = SVR()
-        model.fit(features_scaled, target)
-        
-        missing = df_numeric[df_numeric[column].isna()]
-        if not missing.empty:
-            missing_features = missing.drop(columns=[column])
-            missing_features_imputed = imputer.transform(missing_features)
-            missing_features_scaled = scaler.transform(missing_features_imputed)
-            predicted_values = model.predict(missing_features_scaled)
-            df.loc[missing.index, column] = predicted_values
-    return df
-
-def impute_with_hybrid_knn_rf(df):
-    df_numeric = df.select_dtypes(include=[np.number])
-    imputer = HybridKNNRandomForestImputer(n_neighbors=5, n_estimators=100, max_iterations=10, threshold=1e-4)
-    imputed_data = imputer.fit_transform(df_numeric.values)
-    return pd.DataFrame(imputed_data, columns=df_numeric.columns)
-
-def impute_and_save(input_dir, base_output_dir, df, current_subdir):
-    algorithms = {
-        'KNN': impute_with_knn, 
-        'RandomForest': lambda df: impute_with_random_forest(df, n_estimators=200, max_depth=10, random_state=20),
-        'SVM': impute_with_svm,
-        'RandomForest_MICE': impute_with_random_forest_MICE,
-        'HybridKNN_RF': impute_with_hybrid_knn_rf
-    }
+    Params:
+    key (ArtifactKey): experiment cell of the missing data.
+    name (str): name of algorithm in imputer registry.
+    df (pd.DataFrame): missing data of the cell, first column is the ID.
+    reference (np.ndarray): complete feature values of the combination, used to build the shared index of the imputer.
     
-    modified_output_dir = current_subdir.replace('removed_data', 'impute_algos_result')
-    id_col = df[['ID']]
-    df_numeric = df.drop(columns=['ID'])
-    
-    for name, func in algorithms.items():
-        imputed_df = func(df_numeric.select_dtypes(include=[np.number]))
-        imputed_df = pd.concat([id_col, imputed_df], axis=1)
-        result_file = f'result_data_{name}.xlsx'
-        result_path = os.path.join(modified_output_dir, result_file)
-        os.makedirs(modified_output_dir, exist_ok=True)
-        imputed_df.to_excel(result_path, index=False)
-        print(f"Saved: {result_path}")
-
-# Prompt user for dataset type
-dataset_type = input("Enter the dataset type (e.g., bird, fish, human, etc.): ").strip()
+    return: ArtifactKey of the result and the imputed DataFrame with ID column.
+    """
+    imputer = create_imputer(name)
+    df_numeric = df.drop(columns=['ID']).select_dtypes(include=[np.number])
+    # Built once per combination in each worker process and reused for all of its cells
+    index = imputer.shared_index(f"{key.dataset}/{key.combination}", reference)
+    imputed_data = imputer.fit_transform(df_numeric.to_numpy(dtype=float), index=index)
+    imputed_df = pd.concat([df[['ID']], pd.DataFrame(imputed_data, columns=df_numeric.columns)], axis=1)
+    return key._replace(algorithm=name), imputed_df
 
-# Verify if entered dataset type is valid
 datasets = ["bird", "fish", "human", "mammals_without_humans", "marine_mammals", 
             "terr_herb_and_marine_mammals", "terrestrial_herbivorous_mammals", "terrestrial_mammals"]
-if dataset_type not in datasets:
-    raise ValueError("Invalid dataset type entered. Please try again.")
 
-# Set base paths
-base_dir = os.path.join("..", f"data_impute_project/removed_data/{dataset_type}")
-output_base_dir = os.path.join("..", f"data_impute_project/impute_algos_result/{dataset_type}")
 
-# Start the timer
-start_time = time.time()
+def impute_dataset(dataset_type, algorithms=None, workers=1, blas_threads=1, use_cache=True):
+    """
+    Imputes missing data of all experiment cells of a dataset with every algorithm and saves results to the artifact store.
 
-# Iterate through each dir and file for imputation in the `base_dir` directory using `os.walk()`
-for subdir, _, files in os.walk(base_dir):
-    for file in files:
-        if file.endswith("missing_data.xlsx"):
-            file_path = os.path.join(subdir, file)
-            df = pd.read_excel(file_path)
-            
-            if not df.select_dtypes(include=[np.number]).empty:
-                impute_and_save(subdir, output_base_dir, df, subdir)
-
-# Stop the timer
-end_time = time.time()
-elapsed_time = end_time - start_time
+    Params:
+    dataset_type (str): dataset type, one of `datasets`.
+    algorithms (list): names of algorithms in imputer registry, defaults to all except opt-in ones (`default_algorithms`).
+    workers (int): number of worker processes.
+    blas_threads (int): BLAS/OpenMP threads per worker.
+    use_cache (bool): reuse cached results of tasks computed before with the same data, parameters and imputer code.
+    """
+    algorithms = default_algorithms() if algorithms is None else algorithms
+    
+    # Missing data is reconstructed from mask registry and results are written to artifact store
+    base_dir = os.path.join("..", "data_impute_project")
+    registry = MaskRegistry.open(base_dir, dataset_type)
+    store = open_store(base_dir)
+    cache = TaskCache(os.path.join(base_dir, "artifacts", "task_cache"))
+    
+    # Start the timer
+    start_time = time.time()
+    
+    # Source code of every algorithm is part of the cache key, so a changed imputer never reuses old results
+    code = {name: source_digest(IMPUTERS[name]) for name in algorithms}
+
+    # Complete feature values of every combination, converted once and shared by all tasks of its cells
+    references = {combination: registry.reference(combination).iloc[:, 1:].to_numpy(dtype=float)
+                  for combination in registry.combinations()}
+
+    # Enumerate (experiment cell, algorithm) tasks up front, reusing results of tasks computed before
+    tasks = []
+    digests = {}
+    reused = 0
+    for key in registry.keys():
+        view = registry.view(key)
+        df = view.to_frame()
+        if df.select_dtypes(include=[np.number]).empty:
+            continue
+        for name in algorithms:
+            # Hyperparameters are part of the cache key, so changing them only reruns the affected algorithm
+            digest = task_digest(df, name, create_imputer(name).params, code[name])
+            cached_df = cache.get(digest) if use_cache else None
+            if cached_df is not None:
+                store.save(key._replace(algorithm=name), cached_df)
+                reused += 1
+            else:
+                tasks.append((key, name, df, references[key.combination]))
+                digests[(key, name)] = digest
+    print(f"{len(tasks)} tasks to run, {reused} results reused from cache")
+    
+    for (key, name, _, _), (result_key, imputed_df) in run_tasks(impute_task, tasks, workers=workers, blas_threads=blas_threads):
+        # Cache each result as soon as it completes so an interrupted run resumes from here
+        cache.put(digests[(key, name)], imputed_df)
+        store.save(result_key, imputed_df)
+        print(f"Saved: {result_key}")
+    
+    store.flush()
+    
+    # Stop the timer
+    end_time = time.time()
+    elapsed_time = end_time - start_time
+    
+    # Total execution time
+    print(f"Total execution time for processing the {dataset_type} dataset: {elapsed_time:.2f} seconds")
+
+def main():
+    parser = argparse.ArgumentParser(description="Impute missing data of all experiment cells of a dataset.")
+    parser.add_argument('--dataset', choices=datasets, help="dataset type, prompted for if omitted")
+    parser.add_argument('--workers', type=int, default=1, help="number of worker processes")
+    parser.add_argument('--blas-threads', type=int, default=1, help="BLAS/OpenMP threads per worker")
+    parser.add_argument('--algorithms', nargs='+', default=default_algorithms(), choices=list(IMPUTERS),
+                        help="imputation algorithms to run")
+    parser.add_argument('--no-cache', action='store_true', help="recompute every task instead of reusing cached results")
+    args = parser.parse_args()
+    
+    # Prompt user for dataset type
+    dataset_type = args.dataset or input("Enter the dataset type (e.g., bird, fish, human, etc.): ").strip()
+    
+    # Verify if entered dataset type is valid
+    if dataset_type not in datasets:
+        raise ValueError("Invalid dataset type entered. Please try again.")
+    
+    impute_dataset(dataset_type, args.algorithms, args.workers, args.blas_threads, use_cache=not args.no_cache)
 
-# Total execution time
-print(f"Total execution time for processing the {dataset_type} dataset: {elapsed_time:.2f} seconds")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
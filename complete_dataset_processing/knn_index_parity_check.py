@@ -0,0 +1,69 @@
+import os
+import sys
+import argparse
+import itertools
+import numpy as np
+import pandas as pd
+from sklearn.impute import KNNImputer
+
+# Add project root to path for shared modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from mask_generation import generate_masks, subset_masks
+from neighbour_index import NeighbourIndex
+from percentage_removal_data_from_features import datasets as combination_files, percentages, seeds, legacy_masks
+
+
+def parity_check(dataset_type, n_neighbors=10, tolerance=1e-9):
+    """
+    Imputes every experiment cell (feature set, percentage, seed) of all combination files of a dataset with
+    KNNImputer and with the neighbour index, on the masks of the removal stage, and compares the imputed cells.
+
+    Params:
+    dataset_type (str): dataset type, one of the datasets of the removal stage.
+    n_neighbors (int): number of neighbours, like the KNN imputer.
+    tolerance (float): absolute difference above which an imputed cell counts as different.
+
+    return: DataFrame with one row per combination: number of imputed cells, cells that differ and largest difference.
+    """
+    rows = []
+    for filename in combination_files[dataset_type]:
+        combination = os.path.splitext(filename)[0]
+        df = pd.read_excel(os.path.join("..", "data_impute_project", "combinations", dataset_type, filename))
+        columns = list(df.columns[1:])
+        values = df[columns].to_numpy(dtype=float)
+        index = NeighbourIndex(values)
+        masks = generate_masks(len(df), len(columns), percentages, seeds, legacy=legacy_masks)
+        cells, differing, max_difference = 0, 0, 0.0
+        for L in range(1, len(columns) + 1):
+            for subset in itertools.combinations(columns, L):
+                cell_masks = subset_masks(masks, columns, subset)
+                for i in range(len(seeds)):
+                    for j in range(len(percentages)):
+                        mask = cell_masks[i, j] & index.present
+                        if not mask.any():
+                            continue
+                        expected = KNNImputer(n_neighbors=n_neighbors).fit_transform(np.where(mask, np.nan, values))
+                        difference = np.abs(index.knn_impute(mask, n_neighbors) - expected)[mask]
+                        cells += difference.size
+                        differing += int((difference > tolerance).sum())
+                        max_difference = max(max_difference, float(difference.max()))
+        rows.append({'Dataset': dataset_type, 'Combination': combination, 'Imputed Cells': cells,
+                     'Differing Cells': differing, 'Max Difference': max_difference})
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that the neighbour index reproduces KNNImputer on the removal masks.")
+    parser.add_argument('--datasets', nargs='+', default=['all'], choices=['all'] + list(combination_files))
+    parser.add_argument('--n-neighbors', type=int, default=10)
+    args = parser.parse_args()
+
+    selected_datasets = list(combination_files) if 'all' in args.datasets else args.datasets
+    results = pd.concat([parity_check(dataset_type, args.n_neighbors) for dataset_type in selected_datasets], ignore_index=True)
+    print(results.to_string(index=False))
+    if results['Differing Cells'].sum() > 0:
+        sys.exit("Neighbour index does not reproduce KNNImputer, keep use_neighbour_index disabled")
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,18 @@
 import os
+import sys
 import pandas as pd
 
+# Add project root to path for shared modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from error_summary import best_per_feature
+
 def combine_min_mae_data(input_file_path, output_file_path):
     # Load data
     data = pd.read_excel(input_file_path)
 
-    # List of unique features in dataset
-    unique_features = data['Feature'].unique()
-
-    # Create an empty DataFrame to concatenate all features data
-    combined_data = pd.DataFrame()
-
-    for feature in unique_features:
-        # Filter data for specific feature
-        feature_data = data[data['Feature'] == feature]
-        
-        # Find rows with minimum MAE for each percentage
-        min_mae_rows = feature_data.loc[feature_data.groupby('Percentage')['Min MAE'].idxmin()]
-            
-        # Concatenate data to combined DataFrame
-        combined_data = pd.concat([combined_data, min_mae_rows], ignore_index=True)
+    # Rows with minimum MAE of every feature and percentage
+    combined_data = best_per_feature(data)
 
     # Save combined data to single Excel file
     combined_data.to_excel(output_file_path, index=False)
@@ -0,0 +1,99 @@
+import os
+import sys
+import time
+import argparse
+import traceback
+import pandas as pd
+
+# Add project root to path for shared modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from imputer_registry import IMPUTERS, default_algorithms
+from sweep_scheduler import run_tasks
+from percentage_removal_data_from_features import remove_data
+from impute_algo_all_dataset import impute_dataset, datasets
+from error_combinations_with_all_feature_set_all_dataset import evaluate_errors
+from min_max_mae_mape_results import summarize_min_mae
+
+# Stages run for every dataset, in this order
+stages = ['removal', 'imputation', 'evaluation', 'summary']
+
+
+def process_dataset(dataset_type, selected_stages, algorithms, imputation_workers, blas_threads, use_cache):
+    """
+    Runs selected stages of one dataset. Runs inside a worker process, a failing dataset does not stop the others.
+
+    return: error analysis of the dataset with a Dataset column (None if it failed or was not evaluated),
+    running time in seconds and traceback of the failure (None if it succeeded).
+    """
+    start_time = time.time()
+    try:
+        if 'removal' in selected_stages:
+            remove_data(dataset_type)
+        if 'imputation' in selected_stages:
+            impute_dataset(dataset_type, algorithms, imputation_workers, blas_threads, use_cache)
+        if 'evaluation' in selected_stages:
+            # Minimum MAE summary is tracked while errors are evaluated
+            errors = evaluate_errors(dataset_type, save_summary='summary' in selected_stages)
+        else:
+            # Consolidate error analysis of an earlier run
+            file_path = os.path.join("..", "data_impute_project", "error_metrics", dataset_type, 'error_analysis_with_all_featuresets.csv')
+            errors = pd.read_csv(file_path) if os.path.exists(file_path) else None
+        if 'summary' in selected_stages and 'evaluation' not in selected_stages:
+            summarize_min_mae(dataset_type)
+    except Exception:
+        return None, time.time() - start_time, traceback.format_exc()
+    if errors is not None:
+        errors.insert(0, 'Dataset', dataset_type)
+    return errors, time.time() - start_time, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run removal, imputation, evaluation and summary of several datasets in parallel.")
+    parser.add_argument('--datasets', nargs='+', default=['all'], choices=['all'] + datasets,
+                        help="datasets to process, 'all' for every dataset")
+    parser.add_argument('--jobs', type=int, default=len(datasets), help="number of datasets processed concurrently")
+    parser.add_argument('--stages', nargs='+', default=stages, choices=stages, help="stages to run for every dataset")
+    parser.add_argument('--algorithms', nargs='+', default=default_algorithms(), choices=list(IMPUTERS),
+                        help="imputation algorithms to run")
+    parser.add_argument('--imputation-workers', type=int, default=1, help="worker processes of the imputation stage of each dataset")
+    parser.add_argument('--blas-threads', type=int, default=1, help="BLAS/OpenMP threads per worker")
+    parser.add_argument('--no-cache', action='store_true', help="recompute every imputation task instead of reusing cached results")
+    parser.add_argument('--output', default=os.path.join("..", "data_impute_project", "error_metrics", "all_datasets_error_analysis.csv"),
+                        help="consolidated error analysis of all processed datasets")
+    args = parser.parse_args()
+
+    selected_datasets = datasets if 'all' in args.datasets else list(dict.fromkeys(args.datasets))
+
+    # Start the timer
+    start_time = time.time()
+
+    tasks = [(dataset_type, args.stages, args.algorithms, args.imputation_workers, args.blas_threads, not args.no_cache)
+             for dataset_type in selected_datasets]
+    results = {}
+    failed = []
+    for task, (errors, seconds, error) in run_tasks(process_dataset, tasks, workers=min(args.jobs, len(tasks)), blas_threads=args.blas_threads):
+        dataset_type = task[0]
+        if error is not None:
+            failed.append(dataset_type)
+            print(f"Processing {dataset_type} failed after {seconds:.2f} seconds:\n{error}")
+            continue
+        print(f"Processed {dataset_type} in {seconds:.2f} seconds")
+        if errors is not None:
+            results[dataset_type] = errors
+
+    # One metrics table of all datasets, in order of the dataset list
+    if results:
+        consolidated = pd.concat([results[dataset_type] for dataset_type in selected_datasets if dataset_type in results], ignore_index=True)
+        os.makedirs(os.path.dirname(args.output), exist_ok=True)
+        consolidated.to_csv(args.output, index=False)
+        print(f"Consolidated error analysis saved to: {args.output}")
+
+    # End timer and print running time
+    end_time = time.time()
+    print(f"Running time of all datasets: {end_time - start_time:.2f} seconds")
+    if failed:
+        sys.exit(f"Failed datasets: {', '.join(failed)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import os
+import sys
+import runpy
+import argparse
+from functools import partial
+
+# Add project root to path for shared modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from artifact_store import ParquetStore
+from imputer_registry import IMPUTERS, default_algorithms
+from mask_registry import registry_path
+from pipeline import Pipeline
+from task_cache import project_modules
+from percentage_removal_data_from_features import remove_data, datasets as combination_files
+from impute_algo_all_dataset import impute_dataset, datasets
+from error_combinations_with_all_feature_set_all_dataset import evaluate_errors
+from min_max_mae_mape_results import summarize_min_mae
+
+# All paths are relative to the project root, dataset stages run from this directory like the scripts themselves
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+stage_dir = 'complete_dataset_processing'
+data_dir = 'data_impute_project'
+
+
+def run_script(path):
+    """Runs a top-level script as if it was started with `python <path>`."""
+    runpy.run_path(path, run_name='__main__')
+
+
+def code_inputs(script):
+    """The stage script `script` and every project module it imports, relative to the project root."""
+    return [os.path.relpath(path, project_root) for path in project_modules(os.path.join(project_root, script))]
+
+
+def generate_plots(dataset_type):
+    # matplotlib is only needed when plots are built
+    from generate_mae_plots import generate_plots
+    generate_plots(dataset_type)
+
+
+def build_pipeline(selected_datasets, algorithms, workers, blas_threads):
+    """
+    Declares every stage of the workflow with the files it reads and writes:
+    preprocessing -> split -> combinations -> removal -> imputation -> evaluation -> summary and plots,
+    the last five once per dataset. The code of a stage is its script and the project modules it imports.
+    """
+    pipeline = Pipeline(project_root, os.path.join(project_root, data_dir, 'artifacts', 'pipeline_state.json'))
+    pipeline.add('preprocessing', partial(run_script, 'preprocessing.py'),
+                 inputs=['subdatasets.xlsx'] + code_inputs('preprocessing.py'), outputs=['modified_dataset.xlsx'])
+    pipeline.add('split', partial(run_script, 'split_subdataset.py'),
+                 inputs=['modified_dataset.xlsx'] + code_inputs('split_subdataset.py'), outputs=[f'{data_dir}/data'])
+    pipeline.add('combinations', partial(run_script, 'combinations_generation.py'),
+                 inputs=[f'{data_dir}/data'] + code_inputs('combinations_generation.py'),
+                 outputs=[f'{data_dir}/combinations/{dataset_type}' for dataset_type in datasets])
+
+    store = ParquetStore(data_dir)
+    for dataset_type in selected_datasets:
+        combinations = [os.path.splitext(filename)[0] for filename in combination_files[dataset_type]]
+        masks = registry_path(data_dir, dataset_type)
+        results = [store.path(dataset_type, combination, True) for combination in combinations]
+        error_analysis = f'{data_dir}/error_metrics/{dataset_type}/error_analysis_with_all_featuresets.csv'
+
+        pipeline.add(f'removal/{dataset_type}', partial(remove_data, dataset_type),
+                     inputs=[f'{data_dir}/combinations/{dataset_type}/{combination}.xlsx' for combination in combinations] +
+                            code_inputs(f'{stage_dir}/percentage_removal_data_from_features.py'),
+                     outputs=[masks], workdir=stage_dir)
+        pipeline.add(f'imputation/{dataset_type}', partial(impute_dataset, dataset_type, algorithms, workers, blas_threads),
+                     inputs=[masks] + code_inputs(f'{stage_dir}/impute_algo_all_dataset.py'),
+                     outputs=results, workdir=stage_dir, params={'algorithms': list(algorithms)})
+        pipeline.add(f'evaluation/{dataset_type}', partial(evaluate_errors, dataset_type),
+                     inputs=[masks] + results + code_inputs(f'{stage_dir}/error_combinations_with_all_feature_set_all_dataset.py'),
+                     outputs=[error_analysis], workdir=stage_dir)
+        pipeline.add(f'summary/{dataset_type}', partial(summarize_min_mae, dataset_type),
+                     inputs=[error_analysis] + code_inputs(f'{stage_dir}/min_max_mae_mape_results.py'),
+                     outputs=[f'{data_dir}/error_metrics/{dataset_type}/test_min_mae_mape_results.xlsx'], workdir=stage_dir)
+        pipeline.add(f'plots/{dataset_type}', partial(generate_plots, dataset_type),
+                     inputs=[error_analysis] + code_inputs(f'{stage_dir}/generate_mae_plots.py'),
+                     outputs=[f'{data_dir}/mae_scatter_plots/{dataset_type}'], workdir=stage_dir)
+    return pipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the stages of the workflow whose inputs changed since their last run.")
+    parser.add_argument('targets', nargs='*', help="stages or stage prefixes to build with their upstream stages, "
+                                                   "e.g. summary/bird or evaluation/ (default: all stages)")
+    parser.add_argument('--datasets', nargs='+', default=['all'], choices=['all'] + datasets,
+                        help="datasets whose stages are declared, 'all' for every dataset")
+    parser.add_argument('--algorithms', nargs='+', default=default_algorithms(), choices=list(IMPUTERS),
+                        help="imputation algorithms to run")
+    parser.add_argument('--workers', type=int, default=1, help="worker processes of the imputation stages")
+    parser.add_argument('--blas-threads', type=int, default=1, help="BLAS/OpenMP threads per worker")
+    parser.add_argument('--force', action='store_true', help="run selected stages even if they are up to date")
+    parser.add_argument('--dry-run', action='store_true', help="only show which stages would run and why")
+    args = parser.parse_args()
+
+    selected_datasets = datasets if 'all' in args.datasets else list(dict.fromkeys(args.datasets))
+    pipeline = build_pipeline(selected_datasets, args.algorithms, args.workers, args.blas_threads)
+    executed = pipeline.run(args.targets or None, force=args.force, dry_run=args.dry_run)
+    print(f"{len(executed)} stages {'to run' if args.dry_run else 'run'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+# Add project root to path for shared modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from imputer_registry import create_imputer
+from mask_generation import generate_masks, subset_masks
+from percentage_removal_data_from_features import datasets as combination_files, percentages as removal_percentages, \
+    seeds as removal_seeds, legacy_masks
+
+
+def parity_check(dataset_type, percentages, seeds, params):
+    """
+    Imputes every single-feature cell of all combination files of a dataset with SVM and SVM_Approx
+    and compares their errors on the removed values, on the masks of the removal stage.
+
+    Params:
+    dataset_type (str): dataset type, one of the datasets of the removal stage.
+    percentages (list): percentages of removed values.
+    seeds (list): seeds of the removal masks.
+    params (dict): hyperparameters of SVM_Approx.
+
+    return: DataFrame with one row per combination, feature and percentage: MAE and seconds of both algorithms
+    (summed over seeds for seconds, averaged for MAE) and ratio of MAE of SVM_Approx to SVM.
+    """
+    rows = []
+    for filename in combination_files[dataset_type]:
+        combination = os.path.splitext(filename)[0]
+        df = pd.read_excel(os.path.join("..", "data_impute_project", "combinations", dataset_type, filename))
+        features = list(df.columns[1:])
+        values = df[features].to_numpy(dtype=float)
+        masks = generate_masks(len(values), len(features), percentages, seeds, legacy=legacy_masks)
+        for feature in features:
+            cell_masks = subset_masks(masks, features, (feature,))
+            for p, percentage in enumerate(percentages):
+                errors = {'SVM': [], 'SVM_Approx': []}
+                seconds = {'SVM': 0.0, 'SVM_Approx': 0.0}
+                for s in range(len(seeds)):
+                    mask = cell_masks[s, p] & ~np.isnan(values)
+                    if not mask.any():
+                        continue
+                    missing_values = np.where(mask, np.nan, values)
+                    for name, imputer in [('SVM', create_imputer('SVM')), ('SVM_Approx', create_imputer('SVM_Approx', **params))]:
+                        start_time = time.time()
+                        imputed = imputer.fit_transform(missing_values)
+                        seconds[name] += time.time() - start_time
+                        errors[name].append(np.abs(imputed[mask] - values[mask]).mean())
+                if not errors['SVM']:
+                    continue
+                svm_mae, approx_mae = np.mean(errors['SVM']), np.mean(errors['SVM_Approx'])
+                rows.append({'Dataset': dataset_type, 'Combination': combination, 'Feature': feature, 'Percentage': percentage,
+                             'MAE SVM': svm_mae, 'MAE SVM_Approx': approx_mae,
+                             'MAE Ratio': approx_mae / svm_mae if svm_mae > 0 else np.nan,
+                             'Seconds SVM': seconds['SVM'], 'Seconds SVM_Approx': seconds['SVM_Approx']})
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check accuracy parity of SVM_Approx with SVM on the combination files.")
+    parser.add_argument('--datasets', nargs='+', default=['all'], choices=['all'] + list(combination_files))
+    parser.add_argument('--percentages', type=int, nargs='+', default=removal_percentages)
+    parser.add_argument('--seeds', type=int, nargs='+', default=removal_seeds)
+    parser.add_argument('--approximation', default='nystroem', choices=['nystroem', 'fourier'])
+    parser.add_argument('--n-components', type=int, default=300)
+    parser.add_argument('--solver', default='linear_svr', choices=['linear_svr', 'ridge'])
+    parser.add_argument('--tolerance', type=float, default=1.05, help="highest accepted mean ratio of MAE of SVM_Approx to SVM")
+    parser.add_argument('--output', default=os.path.join("..", "data_impute_project", "benchmarks", "svm_parity.csv"))
+    args = parser.parse_args()
+
+    selected_datasets = list(combination_files) if 'all' in args.datasets else args.datasets
+    params = {'approximation': args.approximation, 'n_components': args.n_components, 'solver': args.solver}
+    results = pd.concat([parity_check(dataset_type, args.percentages, args.seeds, params) for dataset_type in selected_datasets],
+                        ignore_index=True)
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    results.to_csv(args.output, index=False)
+
+    summary = results.groupby('Dataset', sort=False)[['MAE SVM', 'MAE SVM_Approx', 'MAE Ratio', 'Seconds SVM', 'Seconds SVM_Approx']].mean()
+    print(summary.to_string())
+    mean_ratio = results['MAE Ratio'].mean()
+    print(f"Mean MAE ratio SVM_Approx / SVM: {mean_ratio:.4f}, results saved to: {args.output}")
+    if mean_ratio > args.tolerance:
+        sys.exit(f"SVM_Approx is less accurate than SVM beyond tolerance {args.tolerance}")
+
+if __name__ == "__main__":
+    main()
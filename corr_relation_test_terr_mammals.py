@@ -1,9 +1,12 @@
 import pandas as pd
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import mean_squared_error
-from math import sqrt
+import numpy as np
 import os
 
+from artifact_store import ArtifactKey
+from correlation_engine import CorrelationIndex
+from mask_registry import MaskRegistry
+from regression_imputation import impute_simple_regression, impute_multiple_regression
+
 # Initialization of results list
 results_summary = []
 # Function to calculate RMSE and NRMSE
@@ -12,12 +15,12 @@ def calculate_rmse_nrmse(true_values, predicted_values):
     Calculates root mean squared error (RMSE) and normalized root mean squared error (NRMSE) between true and predicted values.
     
     Params:
-    true_values: True values are actual values of target variable.
-    predicted_values: Predicted values are the values that model has predicted
+    true_values: True values are actual values of target variable (rows).
+    predicted_values: Predicted values are the values that model has predicted, can be stacked (e.g. seeds x predictors x rows).
     
-    return: returns two values: root mean squared error (rmse) and normalized root mean squared error (nrmse).
+    return: returns two values: root mean squared error (rmse) and normalized root mean squared error (nrmse), one per stacked prediction.
     """
-    rmse = sqrt(mean_squared_error(true_values, predicted_values))
+    rmse = np.sqrt(np.mean((predicted_values - true_values) ** 2, axis=-1))
     nrmse = rmse / (true_values.max() - true_values.min())
     return rmse, nrmse
 
@@ -25,7 +28,6 @@ def calculate_rmse_nrmse(true_values, predicted_values):
 base_dir = 'data_impute_project'
 combinations_base = f'{base_dir}/combinations/terrestrial_mammals'
 correlation_results_base = f'{base_dir}/corr_combinations/terrestrial_mammals'
-missing_data_base = f'{base_dir}/removed_data/terrestrial_mammals'
 output_base = f'{base_dir}/corr_test/terrestrial_mammals'
 
 # List of combination files and features present in each
@@ -37,7 +39,16 @@ combination_features = {
 
 # Percentage levels and seeds
 percentages = ['10', '15', '20']
-seeds = ['seed1', 'seed2', 'seed3', 'seed4', 'seed5']
+seeds = [1, 2, 3, 4, 5]
+
+# Write imputed data of every seed and predictor to corr_test, only the summary is needed for the analysis
+save_imputed_files = False
+
+# Regularization strength of the regression combining all significant variables of a feature
+alpha = 1.0
+
+# Missing data of each experiment cell
+registry = MaskRegistry.open(base_dir, 'terrestrial_mammals')
 
 # Function to check if the correlation is significant
 def is_significant(p_value, corr_factor, threshold=0.05, corr_threshold=0.5):
@@ -85,7 +96,8 @@ def process_combination(combination_name, features):
     features: Its features present in file contains combinations. Its been iterated over all features to calc RMSE.
     
     return: The function returns list of dictionaries containing summary of
-    results for each combination, feature, feature relation, percentage, RMSE, and NRMSE.
+    results for each combination, feature, feature relation, percentage, RMSE, and NRMSE. Features with more than one
+    significant variable get an extra row (variables joined by ' + ') for the regression combining all of them.
     """
 
     data_complete = safe_load_data(f"{combinations_base}/{combination_name}.xlsx")
@@ -93,110 +105,87 @@ def process_combination(combination_name, features):
     if data_complete is None or corr_results is None:
         return
 
-    # Iterating over different combinations of features, percentages and
-    # seeds to check for significant correlations and calculate RMSE and NRMSE values.
+    # Correlation of every variable pair, looked up by pair instead of scanning the results
+    corr_index = CorrelationIndex(corr_results, is_significant)
+
+    # Iterating over different combinations of features and percentages to impute each feature from its significantly
+    # correlated variables. Regressions of all variables and seeds are fitted together in one vectorized pass.
     for feature in features:
+        variables = [variable for variable in data_complete.columns.drop(feature) if corr_index.is_significant(feature, variable)]
+        if not variables:
+            continue
+        true_values = data_complete[feature].to_numpy(dtype=float)
         for percentage in percentages:
-            for variable in data_complete.columns.drop(feature):  # Check every possible variable relationship
-                # Check correlation significance from the correlation results
-                condition = ((corr_results['Variable 1'] == feature) & (corr_results['Variable 2'] == variable)) | \
-                            ((corr_results['Variable 1'] == variable) & (corr_results['Variable 2'] == feature))
-                filtered_corr_results = corr_results[condition]
-                if not filtered_corr_results.empty and is_significant(filtered_corr_results['P-Value'].iloc[0], filtered_corr_results['Correlation Coefficient'].iloc[0]):
-                    # This list is used to store temporary results, specifically
-                    # RMSE and NRMSE values calculated for each seed iteration within nested loops
-                    temp_results = []
-                    for seed in seeds:
-                        missing_data_path = f"{missing_data_base}/{combination_name}/{feature}/{percentage}/{seed}/missing_data.xlsx"
-                        data_missing = safe_load_data(missing_data_path)
-                        if data_missing is None:
-                            continue
-                        result, _ = impute_and_save(data_complete, data_missing, corr_results, feature, variable, combination_name, percentage, seed)
-                        if result is not None:
-                            rmse, nrmse = calculate_rmse_nrmse(data_complete[feature], result[feature])
-                            temp_results.append((rmse, nrmse))
-                    
-                    # Calculate mean RMSE and NRMSE after all seeds are processed
-                    if temp_results:
-                        mean_rmse = pd.DataFrame(temp_results, columns=['RMSE', 'NRMSE']).mean()
-                        results_summary.append({
-                            "Combination": combination_name,
-                            "Feature": feature,
-                            "FeatureRelation": variable,
-                            "Percentage": percentage,
-                            "RMSE": mean_rmse['RMSE'],
-                            "NRMSE": mean_rmse['NRMSE']
-                        })
-
-# Function to impute and save data
-def impute_and_save(data_complete, data_missing, corr_results, feature, variable, combination_name, percentage, seed):
+            keys = [ArtifactKey('terrestrial_mammals', combination_name, feature, int(percentage), seed, None) for seed in seeds]
+            keys = [key for key in keys if registry.exists(key)]
+            if not keys:
+                continue
+            missing = np.array([registry.view(key).column_mask(feature) for key in keys])
+
+            # Imputed feature of every seed and variable (seeds x variables x rows)
+            imputed = impute_simple_regression(data_complete[variables].to_numpy(dtype=float), true_values, missing)
+            rmse, nrmse = calculate_rmse_nrmse(true_values, imputed)
+            if save_imputed_files:
+                for s, key in enumerate(keys):
+                    for v, variable in enumerate(variables):
+                        save_imputed_data(registry.view(key).to_frame(), imputed[s, v], feature, variable, combination_name, percentage, key.seed)
+
+            # Mean RMSE and NRMSE over seeds
+            for v, variable in enumerate(variables):
+                results_summary.append({
+                    "Combination": combination_name,
+                    "Feature": feature,
+                    "FeatureRelation": variable,
+                    "Percentage": percentage,
+                    "RMSE": rmse[:, v].mean(),
+                    "NRMSE": nrmse[:, v].mean()
+                })
+
+            # All significant variables in one correlation-weighted ridge regression
+            if len(variables) > 1:
+                correlations = [corr_index.get(feature, variable)[0] for variable in variables]
+                combined = impute_multiple_regression(data_complete[variables].to_numpy(dtype=float), true_values, missing, correlations, alpha)
+                rmse, nrmse = calculate_rmse_nrmse(true_values, combined)
+                results_summary.append({
+                    "Combination": combination_name,
+                    "Feature": feature,
+                    "FeatureRelation": " + ".join(variables),
+                    "Percentage": percentage,
+                    "RMSE": rmse.mean(),
+                    "NRMSE": nrmse.mean()
+                })
+
+# Function to save imputed data
+def save_imputed_data(data_missing, imputed_values, feature, variable, combination_name, percentage, seed):
     """
-    The function takes in complete and missing data and correlation results
-    parameters to impute missing values using linear regression and save results to Excel file.
+    Saves missing data with `feature` imputed from `variable` by linear regression to Excel file.
     
     Params:
-    data_complete: its complete dataset that contains all data including missing values for imputation
-    data_missing: `data_missing` is DataFrame containing dataset with missing values that
-    we want to impute. It includes feature  for which we perform imputation.
-    corr_results: contains correlation results between different variables.
-    feature: refers to column in dataset that contains missing values which we wanna impute.
-    variable: used to impute missing values in `feature` column of  dataset. It is column in
-    dataset that will be used as a predictor to estimate the missing values in feature.
+    data_missing: DataFrame containing dataset with missing values of `feature`.
+    imputed_values: imputed values of `feature` for all rows.
+    feature: column in dataset that contains missing values which we impute.
+    variable: column of dataset used as predictor to estimate the missing values in feature.
     combination_name: combination of features used for imputation.
     percentage: percentage of missing values that were imputed in dataset.
-    seed: The `seed` parameter used to set the random seed
-    for reproducibility in imputation process. Setting a seed ensures that same random values
-    are generated each time the function is run with same seed value.
-
-    :return: The function `impute_and_save` returns a tuple containing the result DataFrame after
-    imputation and the output filename where the imputed data is saved. If there is no correlation data
-    found for the specified feature with the variable, it returns `None` along with a message indicating
-    the absence of correlation data. If the correlation is not significant based on the p-value and
-    correlation coefficient, it returns None
-    """
-    # Check if correlation significant for both cases: feature as Variable 1 or Variable 2
-    condition = ((corr_results['Variable 1'] == feature) & (corr_results['Variable 2'] == variable)) | \
-                ((corr_results['Variable 1'] == variable) & (corr_results['Variable 2'] == feature))
-    filtered_corr_results = corr_results[condition]
-
-    if filtered_corr_results.empty:
-        return None, f"No correlation data found for {feature} with {variable}"
-
-    # Select relevant row if multiple rows, prioritize feature as Variable 1
-    if len(filtered_corr_results) > 1:
-        row = filtered_corr_results[filtered_corr_results['Variable 1'] == feature]
-        if row.empty:
-            row = filtered_corr_results.iloc[0]  # Fallback to any available row
-    else:
-        row = filtered_corr_results.iloc[0]
+    seed: seed of the removal of missing values.
 
-    if not is_significant(row['P-Value'], row['Correlation Coefficient']):
-        return None, f"Imputation not performed for {feature} with {variable} due to low correlation or high p-value."
-    
-    # Prepare data
-    train = data_missing.dropna(subset=[feature]).copy()
-    test = data_missing[data_missing[feature].isnull()].copy()
-    
-    # Train and predict
-    model = LinearRegression()
-    model.fit(train[[variable]], train[feature])
-    predicted_values = model.predict(test[[variable]])
-    test.loc[:, feature] = test[feature].fillna(pd.Series(predicted_values, index=test.index))
-    
-    # Combine the train and test datasets into result DataFrame
-    result = pd.concat([train, test]).sort_index()
+    return: output filename where the imputed data is saved.
+    """
+    result = data_missing.copy()
+    result[feature] = imputed_values
     
     # Define output filename and path
     output_path = f"{output_base}/{combination_name}/{feature}/{percentage}"
     os.makedirs(output_path, exist_ok=True)
-    output_filename = f"{seed}_imputed_by_{variable}.xlsx"
+    output_filename = f"seed{seed}_imputed_by_{variable}.xlsx"
     result.to_excel(os.path.join(output_path, output_filename), index=False)
     
-    return result, output_filename
+    return output_filename
 
 # Export summary results to Excel
 def export_results_to_excel():
     df = pd.DataFrame(results_summary)
+    os.makedirs(output_base, exist_ok=True)
     output_path = os.path.join(output_base, "imputation_summary.xlsx")
     df.to_excel(output_path, index=False)
 
@@ -0,0 +1,128 @@
+from itertools import combinations
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+
+def _pearson_matrix(values, present):
+    """
+    Pairwise-complete Pearson correlation of all column pairs from masked sums.
+
+    return: correlation matrix and matrix of the number of rows where both columns are present.
+    """
+    present = present.astype(float)
+    # Columns are shifted by their mean first, so that the masked sums do not lose precision on
+    # features with large mean and small spread such as 87Sr/86Sr
+    shifted = values - np.nanmean(values, axis=0) if values.size else values
+    x = np.where(present > 0, shifted, 0.0)
+    count = present.T @ present
+    sum_x = x.T @ present
+    sum_xx = (x ** 2).T @ present
+    sum_xy = x.T @ x
+    with np.errstate(divide='ignore', invalid='ignore'):
+        covariance = sum_xy - sum_x * sum_x.T / count
+        variance_x = sum_xx - sum_x ** 2 / count
+        variance_y = variance_x.T
+        corr = covariance / np.sqrt(variance_x * variance_y)
+    return np.clip(corr, -1.0, 1.0), count
+
+
+def _p_values(corr, count):
+    """Two-sided p-values of correlation coefficients (t-test with n - 2 degrees of freedom, like scipy.stats.pearsonr)."""
+    df = count - 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = corr * np.sqrt(df / ((1.0 - corr) * (1.0 + corr)))
+        p_values = 2 * stats.t.sf(np.abs(t), df)
+    # Two points always lie on a line, their correlation carries no evidence
+    return np.where(count == 2, 1.0, p_values)
+
+
+def correlation_matrix(data, method='pearson'):
+    """
+    Pairwise-complete correlation coefficients and p-values of all columns of a numeric DataFrame, computed
+    in one vectorized pass: every pair uses the rows where both of its columns are present.
+
+    Params:
+    data (pd.DataFrame): numeric columns, NaN for missing values.
+    method (str): 'pearson' or 'spearman'.
+
+    return: square DataFrames of correlation coefficients, p-values and pairwise row counts.
+    """
+    values = data.to_numpy(dtype=float)
+    present = ~np.isnan(values)
+    if method == 'pearson':
+        corr, count = _pearson_matrix(values, present)
+    elif method == 'spearman':
+        # Ranks of complete columns are shared by all pairs, only pairs with rows missing in one of the
+        # two columns have to be ranked on their own rows
+        ranks = np.where(present, data.rank().to_numpy(dtype=float), np.nan)
+        corr, count = _pearson_matrix(ranks, present)
+        for i, j in combinations(range(values.shape[1]), 2):
+            both = present[:, i] & present[:, j]
+            if both.any() and not (np.array_equal(both, present[:, i]) and np.array_equal(both, present[:, j])):
+                pair_ranks = np.column_stack([stats.rankdata(values[both, i]), stats.rankdata(values[both, j])])
+                pair_corr, _ = _pearson_matrix(pair_ranks, np.ones_like(pair_ranks, dtype=bool))
+                corr[i, j] = corr[j, i] = pair_corr[0, 1]
+    else:
+        raise ValueError(f"Unknown correlation method '{method}'. Choose 'pearson' or 'spearman'.")
+    p_values = _p_values(corr, count)
+    columns = data.columns
+    return (pd.DataFrame(corr, index=columns, columns=columns), pd.DataFrame(p_values, index=columns, columns=columns),
+            pd.DataFrame(count.astype(int), index=columns, columns=columns))
+
+
+def pairwise_correlations(data, method='pearson', names=('Feature 1', 'Feature 2')):
+    """
+    Tidy table of the correlation of every column pair of a numeric DataFrame, pairs in itertools.combinations
+    order. Pairs without any row where both columns are present are left out.
+
+    Params:
+    data (pd.DataFrame): numeric columns, NaN for missing values.
+    method (str): 'pearson' or 'spearman'.
+    names (tuple): names of the two columns holding the pair.
+
+    return: DataFrame with columns names[0], names[1], Correlation Coefficient, P-Value.
+    """
+    corr, p_values, count = correlation_matrix(data, method)
+    first, second = np.triu_indices(data.shape[1], k=1)
+    keep = count.to_numpy()[first, second] > 0
+    first, second = first[keep], second[keep]
+    return pd.DataFrame({
+        names[0]: data.columns[first],
+        names[1]: data.columns[second],
+        'Correlation Coefficient': corr.to_numpy()[first, second],
+        'P-Value': p_values.to_numpy()[first, second]
+    })
+
+
+class CorrelationIndex:
+    """
+    Correlation results of a combination keyed by variable pair in both orders, built once so that each lookup
+    is a dict access instead of a scan of the results table. Significance of every pair is precomputed.
+    If a pair appears more than once, the row listing `feature` first is preferred, otherwise the first row.
+    """
+    def __init__(self, corr_results, significance):
+        """
+        Params:
+        corr_results (pd.DataFrame): pairs in columns Variable 1 / Variable 2 (or Feature 1 / Feature 2)
+        with Correlation Coefficient and P-Value columns.
+        significance: function (p_value, corr_coefficient) -> bool deciding if a correlation is significant.
+        """
+        first, second = ('Variable 1', 'Variable 2') if 'Variable 1' in corr_results.columns else ('Feature 1', 'Feature 2')
+        direct = {}
+        fallback = {}
+        for variable_1, variable_2, corr_coefficient, p_value in zip(corr_results[first], corr_results[second],
+                                                                       corr_results['Correlation Coefficient'], corr_results['P-Value']):
+            entry = (corr_coefficient, p_value, significance(p_value, corr_coefficient))
+            direct.setdefault((variable_1, variable_2), entry)
+            fallback.setdefault((variable_1, variable_2), entry)
+            fallback.setdefault((variable_2, variable_1), entry)
+        self._pairs = {**fallback, **direct}
+
+    def get(self, feature, variable):
+        """(correlation coefficient, p-value, significant) of the pair, None if it has no correlation result."""
+        return self._pairs.get((feature, variable))
+
+    def is_significant(self, feature, variable):
+        entry = self._pairs.get((feature, variable))
+        return entry is not None and entry[2]
@@ -0,0 +1,110 @@
+import heapq
+import pandas as pd
+
+
+def min_rows(data, by, metric):
+    """
+    Row with minimum `metric` of every group of `by`, found in a single grouped idxmin pass.
+    Groups are ordered like nested loops over the unique values of each column of `by` (order of first
+    appearance), ties keep the first row. Rows without a value of `metric` are ignored.
+    """
+    data = data.dropna(subset=[metric]).reset_index(drop=True)
+    rows = data.loc[data.groupby(by, sort=False)[metric].idxmin()]
+    ranks = pd.DataFrame({column: pd.factorize(data[column])[0] for column in by}, index=data.index)
+    order = ranks.loc[rows.index].sort_values(by, kind='stable').index
+    return rows.loc[order].reset_index(drop=True)
+
+
+def min_mae_per_algorithm(errors):
+    """
+    Feature set with minimum MAE of every combination, feature, algorithm and percentage.
+
+    Params:
+    errors (pd.DataFrame): error analysis with columns Combination, Feature, Algorithm, Percentage, FeatureSet, MAE, MAPE.
+
+    return: DataFrame with columns Combination, Feature, Algorithm, Percentage, FeatureSet, Min MAE, MAPE at Min MAE.
+    """
+    rows = min_rows(errors, ['Combination', 'Feature', 'Algorithm', 'Percentage'], 'MAE')
+    rows = rows[['Combination', 'Feature', 'Algorithm', 'Percentage', 'FeatureSet', 'MAE', 'MAPE']]
+    return rows.rename(columns={'MAE': 'Min MAE', 'MAPE': 'MAPE at Min MAE'})
+
+
+def best_per_feature(min_mae_results):
+    """Rows of the minimum MAE results (see min_mae_per_algorithm) with the lowest Min MAE of every feature and percentage."""
+    return min_rows(min_mae_results, ['Feature', 'Percentage'], 'Min MAE')
+
+
+def global_best_per_feature(data):
+    """
+    Global best MAE and best MAPE of every feature and percentage across all algorithms and combinations.
+
+    Params:
+    data (pd.DataFrame): results with columns Combination, Feature, Algorithm, Percentage, FeatureSet, MAE, MAPE.
+
+    return: DataFrame with one row per feature and percentage, the configuration with the best MAE and the one with the best MAPE.
+    """
+    best_mae = min_rows(data, ['Feature', 'Percentage'], 'MAE').rename(columns={
+        'MAE': 'Global Best MAE',
+        'MAPE': 'MAPE at Global Best MAE',
+        'Algorithm': 'Best Algorithm (MAE)',
+        'Combination': 'Best Combination (MAE)',
+        'FeatureSet': 'FeatureSet (Best MAE)'
+    })
+    best_mape = min_rows(data, ['Feature', 'Percentage'], 'MAPE').rename(columns={
+        'MAE': 'MAE at Global Best MAPE',
+        'MAPE': 'Global Best MAPE',
+        'Algorithm': 'Best Algorithm (MAPE)',
+        'Combination': 'Best Combination (MAPE)',
+        'FeatureSet': 'FeatureSet (Best MAPE)'
+    })
+    combined = pd.merge(best_mae, best_mape, on=['Feature', 'Percentage'], how='outer', sort=False)
+    return combined[[
+        'Feature', 'Percentage',
+        'Best Combination (MAE)', 'Best Algorithm (MAE)', 'FeatureSet (Best MAE)', 'Global Best MAE', 'MAPE at Global Best MAE',
+        'Best Combination (MAPE)', 'Best Algorithm (MAPE)', 'FeatureSet (Best MAPE)', 'MAE at Global Best MAPE', 'Global Best MAPE'
+    ]]
+
+
+class BestConfigurationTracker:
+    """
+    Keeps the `k` configurations with the lowest MAE of every (combination, feature, algorithm, percentage)
+    while metrics are produced, in a bounded heap per key, so the minimum MAE summary needs no second pass
+    over the error analysis. Ties keep the configuration seen first, like idxmin.
+    """
+    key_columns = ['Combination', 'Feature', 'Algorithm', 'Percentage']
+
+    def __init__(self, k=1):
+        self.k = k
+        self._heaps = {}
+        self._count = 0
+        # Order of first appearance of every value of each key column, to order the summary like nested loops
+        self._first_seen = [{} for _ in self.key_columns]
+
+    def add(self, combination, feature, algorithm, percentage, feature_set, mae, mape):
+        """Offers one evaluated configuration, configurations without MAE are ignored."""
+        if pd.isna(mae):
+            return
+        key = (combination, feature, algorithm, percentage)
+        for first_seen, value in zip(self._first_seen, key):
+            first_seen.setdefault(value, len(first_seen))
+        heap = self._heaps.setdefault(key, [])
+        # Max-heap on (MAE, arrival) holding the k best, its root is the worst configuration kept
+        entry = (-mae, -self._count, feature_set, mape)
+        self._count += 1
+        if len(heap) < self.k:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    def best(self, key):
+        """Kept configurations of `key` as (feature_set, mae, mape), best first."""
+        return [(feature_set, -neg_mae, mape) for neg_mae, _, feature_set, mape in sorted(self._heaps.get(key, []), reverse=True)]
+
+    def summary(self):
+        """Minimum MAE results like min_mae_per_algorithm, one row per key and rank (Rank 1 is the best)."""
+        rows = []
+        for key in sorted(self._heaps, key=lambda key: [first_seen[value] for first_seen, value in zip(self._first_seen, key)]):
+            for rank, (feature_set, mae, mape) in enumerate(self.best(key), start=1):
+                rows.append([*key, rank, feature_set, mae, mape])
+        summary = pd.DataFrame(rows, columns=self.key_columns + ['Rank', 'FeatureSet', 'Min MAE', 'MAPE at Min MAE'])
+        return summary.drop(columns='Rank') if self.k == 1 else summary
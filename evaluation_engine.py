@@ -0,0 +1,137 @@
+from collections import defaultdict
+from itertools import combinations
+import numpy as np
+import pandas as pd
+
+from artifact_store import ArtifactKey
+
+
+def batched_errors(original, imputed, masks):
+    """
+    MAE, MAPE and MAE (‰) of many imputations of one feature computed in a single reduction.
+
+    Params:
+    original (np.ndarray): complete values of the feature (rows).
+    imputed (np.ndarray): imputed values of the feature stacked along leading axes, e.g. (algorithms x seeds x rows).
+    masks (np.ndarray): boolean removal masks broadcastable to `imputed`, e.g. (seeds x rows), True where data was removed.
+
+    return: arrays MAE, MAPE and MAE (‰) with shape imputed.shape[:-1]. Errors are 0 where nothing was removed.
+    Removed values whose original is 0 are left out of MAPE (NaN if all of them are 0).
+    MAE (‰) is MAE relative to the mean of the original feature, 0 if that mean is 0.
+    """
+    original = np.asarray(original, dtype=float)
+    masks = np.broadcast_to(masks, imputed.shape)
+    count = masks.sum(axis=-1)
+    absolute = np.where(masks, np.abs(original - imputed), 0.0)
+    mae = absolute.sum(axis=-1) / np.maximum(count, 1)
+
+    nonzero = masks & (original != 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        relative = np.where(nonzero, absolute / np.abs(original), 0.0)
+        mape = np.where(count > 0, relative.sum(axis=-1) / nonzero.sum(axis=-1) * 100, 0.0)
+
+    mean_original = original.mean()
+    mae_per_thousand = mae / mean_original * 1000 if mean_original != 0 else np.zeros_like(mae)
+    return mae, mape, mae_per_thousand
+
+
+def get_feature_sets(features, current_feature):
+    """Names of all feature sets (removed column subsets) containing `current_feature`, e.g. A, AB, ABC."""
+    feature_sets = []
+    for i in range(1, len(features) + 1):
+        for comb in combinations(features, i):
+            if current_feature in comb:
+                feature_sets.append(''.join(comb))
+    return feature_sets
+
+
+def index_artifacts(store, registry, dataset, algorithms, percentages, seeds):
+    """
+    Lists imputed results of a dataset available for evaluation, grouped by combination.
+
+    return: dict combination -> list of ArtifactKey of results whose combination has a reference in the registry.
+    """
+    index = defaultdict(list)
+    references = set(registry.combinations())
+    for key in store.keys(dataset, results=True):
+        if key.algorithm in algorithms and key.percentage in percentages and key.seed in seeds \
+                and key.combination in references:
+            index[key.combination].append(key)
+    return index
+
+
+def evaluate_dataset(store, registry, dataset, algorithms, percentages, seeds, tracker=None):
+    """
+    Computes MAE, MAPE and MAE (‰) of every (combination, feature, percentage, feature set, algorithm), averaged over seeds.
+    All results are indexed first and every result is loaded exactly once. Results of all algorithms and seeds of a
+    (feature set, percentage) cell are stacked and each feature of the feature set is scored in one batched reduction
+    against the removal masks of the single-feature cells of the same percentage and seeds, as before.
+
+    Params:
+    store: artifact store with the imputed results.
+    registry (MaskRegistry): removal masks and complete combination data of the dataset.
+    dataset (str): dataset type.
+    algorithms (list): algorithm names, in output order.
+    percentages (list): removal percentages.
+    seeds (list): seeds averaged over.
+    tracker (BestConfigurationTracker): receives every row as it is produced, to summarize best feature sets without a second pass.
+
+    return: DataFrame with columns Combination, Feature, Percentage, Algorithm, FeatureSet, MAE, MAPE, MAE (‰).
+    Errors are inf where no result was found.
+    """
+    index = index_artifacts(store, registry, dataset, algorithms, percentages, seeds)
+    errors = {}
+
+    for combination, keys in index.items():
+        reference = registry.reference(combination)
+        features = list(reference.columns[1:])
+        feature_set_members = {''.join(comb): comb for i in range(1, len(features) + 1) for comb in combinations(features, i)}
+        cells = defaultdict(set)
+        for key in keys:
+            cells[(key.feature_set, key.percentage)].add((key.algorithm, key.seed))
+
+        # Removal masks of single-feature cells (seeds x rows) and whether each seed has one
+        feature_masks = {}
+        for feature in features:
+            for percentage in percentages:
+                mask_keys = [ArtifactKey(dataset, combination, feature, percentage, seed, None) for seed in seeds]
+                has_mask = np.array([registry.exists(mask_key) for mask_key in mask_keys])
+                masks = np.zeros((len(seeds), len(reference)), dtype=bool)
+                for s in np.flatnonzero(has_mask):
+                    masks[s] = registry.view(mask_keys[s]).column_mask(feature)
+                feature_masks[(feature, percentage)] = masks, has_mask
+
+        for (feature_set, percentage), available in cells.items():
+            members = feature_set_members.get(feature_set, ())
+            imputed = np.full((len(algorithms), len(seeds), len(members), len(reference)), np.nan)
+            found = np.zeros((len(algorithms), len(seeds), len(members)), dtype=bool)
+            for a, algorithm in enumerate(algorithms):
+                for s, seed in enumerate(seeds):
+                    if (algorithm, seed) not in available:
+                        continue
+                    result = store.load(ArtifactKey(dataset, combination, feature_set, percentage, seed, algorithm))
+                    for j, feature in enumerate(members):
+                        if feature in result.columns:
+                            imputed[a, s, j] = result[feature].to_numpy(dtype=float)
+                            found[a, s, j] = True
+
+            for j, feature in enumerate(members):
+                masks, has_mask = feature_masks[(feature, percentage)]
+                valid = found[:, :, j] & has_mask
+                metrics = batched_errors(reference[feature].to_numpy(dtype=float), imputed[:, :, j], masks)
+                for a, algorithm in enumerate(algorithms):
+                    if valid[a].any():
+                        errors[(combination, feature, percentage, feature_set, algorithm)] = [np.mean(metric[a, valid[a]]) for metric in metrics]
+
+    rows = []
+    for combination in registry.combinations():
+        features = list(registry.reference(combination).columns[1:])
+        for feature in features:
+            for percentage in percentages:
+                for feature_set in get_feature_sets(features, feature):
+                    for algorithm in algorithms:
+                        mean_errors = errors.get((combination, feature, percentage, feature_set, algorithm), [float('inf')] * 3)
+                        rows.append([combination, feature, percentage, algorithm, feature_set, *mean_errors])
+                        if tracker is not None:
+                            tracker.add(combination, feature, algorithm, percentage, feature_set, *mean_errors[:2])
+    return pd.DataFrame(rows, columns=['Combination', 'Feature', 'Percentage', 'Algorithm', 'FeatureSet', 'MAE', 'MAPE', 'MAE (‰)'])
@@ -1,79 +1,179 @@
+import time
 import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
 from sklearn.impute import KNNImputer
 from sklearn.ensemble import RandomForestRegressor
 
+from multi_output_forest import impute_by_pattern_forests
+
 class HybridKNNRandomForestImputer:
-    def __init__(self, n_neighbors=5, n_estimators=100, max_iterations=10, threshold=1e-4, random_state=20):
+    def __init__(self, n_neighbors=5, n_estimators=100, max_iterations=10, threshold=1e-4, random_state=20,
+                 incremental=False, warm_start_trees=10, column_threshold=None, n_jobs=1, parallel_columns=False,
+                 multi_output=False, min_pattern_rows=10, neighbour_index=None):
         """
         Initializes parameters for KNN imputer and Random Forest regressor with default values.
-        
+
         Params:
-        n_neighbors: it specifies number of neighboring samples to use for imputation in KNNImputer. 
+        n_neighbors: it specifies number of neighboring samples to use for imputation in KNNImputer.
         It determines how many nearest neighbors will be considered when imputing missing values in the dataset. in our case its 5.
         n_estimators: determine number of trees in random forest ensemble. In our case its 100.
         max_iterations: set 10 as maximum iteration. It tells maximum number of iterations that will be performed
         threshold: thresold is `0.0001`, its convergence criteria for algorithm
         random_state: set the random seed for reproducibility in algorithms.
+        incremental: if True, keeps one forest per column across iterations and only grows it by `warm_start_trees`
+        new trees per iteration (warm start) instead of refitting 100 trees, and stops refitting columns whose
+        imputed values changed less than `column_threshold` in the previous iteration.
+        warm_start_trees: number of trees added to a column forest in every iteration after the first one (incremental mode).
+        column_threshold: per-column convergence criteria (mean absolute change of imputed values of the column),
+        defaults to `threshold` (incremental mode).
+        n_jobs: number of threads used to fit random forests. Trees of each forest are built in parallel, which gives
+        the same result as a single thread up to floating point rounding of the averaged predictions.
+        parallel_columns: if True, forests of all columns are fit concurrently (one thread per column, up to `n_jobs`)
+        on the imputation of the previous iteration instead of one after another on the values updated so far.
+        Results are deterministic for every `n_jobs`, but differ slightly from the sequential column update.
+        multi_output: if True, one multi-output forest per missingness pattern predicts all missing columns of its rows
+        at once from the previous iteration, instead of one forest per column (see impute_by_pattern_forests).
+        min_pattern_rows: patterns with fewer rows are predicted by the forest of a pattern missing all of their columns
+        (multi-output mode).
+        neighbour_index: NeighbourIndex of the complete data X was masked from. If given, the initial KNN imputation
+        derives its distances from the index instead of recomputing them.
         """
         self.n_neighbors = n_neighbors
         self.n_estimators = n_estimators
         self.max_iterations = max_iterations
         self.threshold = threshold
         self.random_state = random_state
+        self.incremental = incremental
+        self.warm_start_trees = warm_start_trees
+        self.column_threshold = threshold if column_threshold is None else column_threshold
+        self.n_jobs = n_jobs
+        self.parallel_columns = parallel_columns
+        self.multi_output = multi_output
+        self.min_pattern_rows = min_pattern_rows
+        self.neighbour_index = neighbour_index
         self.knn_imputer = KNNImputer(n_neighbors=self.n_neighbors)
-        self.rf_regressor = RandomForestRegressor(n_estimators=self.n_estimators, random_state=self.random_state)
+        # Template of the per-column regressors, forests are only built in parallel when columns are not
+        self.rf_regressor = RandomForestRegressor(n_estimators=self.n_estimators, random_state=self.random_state,
+                                                  n_jobs=1 if self.parallel_columns else self.n_jobs)
+        # Per-iteration metrics of the last call to fit_transform
+        self.history_ = []
 
     def fit_transform(self, X):
         """
         Performs iterative imputation using KNN and Random Forest methods until convergence is reached.
-        
+
         Params:
         X: Its input data which needs to be imputed using a combination of KNN imputation and
         Random Forest imputation techniques.
 
 
         return: returns the final imputed dataset after the iterative imputation process.
+        After the call `history_` holds one dict per iteration with its runtime in seconds, mean change
+        of the whole matrix, mean change of the imputed values per column and the columns that were refit.
         """
+        missing = np.isnan(X)
+        self.history_ = []
+        self._forests = {}
+        active_columns = [i for i in range(X.shape[1]) if missing[:, i].any()]
+
         # Initial KNN Imputation
-        X_imputed = self.knn_imputer.fit_transform(X)
+        if self.neighbour_index is not None:
+            X_imputed = self.neighbour_index.knn_impute(missing & self.neighbour_index.present, self.n_neighbors)
+        else:
+            X_imputed = self.knn_imputer.fit_transform(X)
         previous_imputation = np.copy(X_imputed)
-        
+
         for iteration in range(self.max_iterations):
+            start_time = time.time()
+
             # Random Forest Imputation
-            X_rf_imputed = self._random_forest_impute(X, X_imputed)
-            
-            # KNN Refinement
-            X_imputed = self.knn_imputer.fit_transform(X_rf_imputed)
-            
+            X_rf_imputed = self._random_forest_impute(X, X_imputed, active_columns, iteration)
+
+            # KNN Refinement, only needed if values are still missing (KNN leaves a complete matrix unchanged)
+            if np.isnan(X_rf_imputed).any():
+                X_imputed = self.knn_imputer.fit_transform(X_rf_imputed)
+            else:
+                X_imputed = X_rf_imputed
+
             # Check for convergence
             change = np.abs(X_imputed - previous_imputation).mean()
+            column_changes = {i: np.abs(X_imputed[missing[:, i], i] - previous_imputation[missing[:, i], i]).mean()
+                              for i in range(X.shape[1]) if missing[:, i].any()}
+            self.history_.append({
+                'iteration': iteration + 1,
+                'seconds': time.time() - start_time,
+                'change': change,
+                'column_changes': column_changes,
+                'refit_columns': list(active_columns)
+            })
             if change < self.threshold:
                 print(f"Convergence reached after {iteration+1} iterations.")
                 break
-                
+
+            # Freeze columns whose imputed values have settled
+            if self.incremental:
+                active_columns = [i for i in active_columns if column_changes[i] >= self.column_threshold]
+                if not active_columns:
+                    print(f"All columns converged after {iteration+1} iterations.")
+                    break
+
             previous_imputation = np.copy(X_imputed)
-            
+
         return X_imputed
-    
-    def _random_forest_impute(self, X_original, X_imputed):
+
+    def _column_regressor(self, i, iteration):
+        """
+        Returns an independent regressor used to impute column `i` (or the tuple of columns of a missingness pattern
+        in multi-output mode), seeded with `random_state`. Without incremental mode its a fresh clone of `rf_regressor`,
+        otherwise a per-column forest which is grown with warm start.
+        """
+        if not self.incremental:
+            return clone(self.rf_regressor)
+        if i not in self._forests:
+            self._forests[i] = clone(self.rf_regressor).set_params(warm_start=True)
+        elif iteration > 0:
+            self._forests[i].n_estimators += self.warm_start_trees
+        return self._forests[i]
+
+    @staticmethod
+    def _fit_predict_column(regressor, X_imputed, missing_mask, i):
+        """Fits regressor of column `i` on rows where it is observed and predicts rows where it is missing."""
+        X_train = np.delete(X_imputed, i, axis=1)
+        regressor.fit(X_train[~missing_mask], X_imputed[~missing_mask, i])
+        return regressor.predict(X_train[missing_mask])
+
+    def _random_forest_impute(self, X_original, X_imputed, columns=None, iteration=0):
         """
         It impute missing values in dataset using random forest regressor.
-        
+
         Params:
         X_original: X_original is original dataset with missing values
         X_imputed: X_imputed is input data with missing values
-        
+        columns: indices of columns to impute, defaults to all columns
+        iteration: current iteration of fit_transform, used to grow forests in incremental mode
+
         return: returns the imputed dataset after filling in missing values using a random forest regressor.
         """
+        columns = range(X_original.shape[1]) if columns is None else columns
+        if self.multi_output:
+            # Forests of all patterns are fit on the same snapshot, like parallel columns
+            return impute_by_pattern_forests(X_imputed, np.isnan(X_original), lambda targets: self._column_regressor(targets, iteration),
+                                             columns, self.min_pattern_rows, self.n_jobs if self.parallel_columns else 1)
+
         X_rf_imputed = np.copy(X_imputed)
-        
-        for i in range(X_original.shape[1]):
-            missing_mask = np.isnan(X_original[:, i])
-            if missing_mask.any():
-                X_train = np.delete(X_rf_imputed, i, axis=1)
-                y_train = X_rf_imputed[:, i]
-                
-                self.rf_regressor.fit(X_train[~missing_mask], y_train[~missing_mask])
-                X_rf_imputed[missing_mask, i] = self.rf_regressor.predict(X_train[missing_mask])
-                
-        return X_rf_imputed
\ No newline at end of file
+        missing_masks = {i: np.isnan(X_original[:, i]) for i in columns if np.isnan(X_original[:, i]).any()}
+        regressors = {i: self._column_regressor(i, iteration) for i in missing_masks}
+
+        if self.parallel_columns:
+            # Every column is fit on the same snapshot, so the fits are independent of each other
+            predictions = Parallel(n_jobs=self.n_jobs, prefer='threads')(
+                delayed(self._fit_predict_column)(regressors[i], X_imputed, missing_masks[i], i) for i in missing_masks)
+            for i, predicted_values in zip(missing_masks, predictions):
+                X_rf_imputed[missing_masks[i], i] = predicted_values
+        else:
+            # Each column is fit on the values imputed so far, including columns updated before it
+            for i, missing_mask in missing_masks.items():
+                X_rf_imputed[missing_mask, i] = self._fit_predict_column(regressors[i], X_rf_imputed, missing_mask, i)
+
+        return X_rf_imputed
@@ -0,0 +1,360 @@
+import numpy as np
+from sklearn.impute import KNNImputer
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.experimental import enable_iterative_imputer
+from sklearn.impute import IterativeImputer
+from sklearn.svm import SVR, LinearSVR
+from sklearn.kernel_approximation import Nystroem, RBFSampler
+from sklearn.linear_model import Ridge
+from sklearn.preprocessing import StandardScaler
+
+from hybrid_KNN_RF_Impute import HybridKNNRandomForestImputer
+from mice_engine import ChainedEquationsImputer
+from missingness_patterns import MissingnessPatterns
+from multi_output_forest import impute_by_pattern_forests
+from neighbour_index import shared_index
+from regression_imputation import impute_correlation_regression, shared_statistics
+
+# Algorithm name -> imputer class, filled by `register_imputer`
+IMPUTERS = {}
+
+
+def register_imputer(cls):
+    """Class decorator adding an imputer to the registry under its `name`."""
+    IMPUTERS[cls.name] = cls
+    return cls
+
+
+def create_imputer(name, **params):
+    """
+    Creates imputer registered under `name`.
+
+    Params:
+    name (str): algorithm name, e.g. KNN or HybridKNN_RF.
+    params: hyperparameters overriding the declared defaults of the imputer.
+    """
+    if name not in IMPUTERS:
+        raise ValueError(f"Unknown imputation algorithm '{name}'. Choose from {list(IMPUTERS)}.")
+    return IMPUTERS[name](**params)
+
+
+def default_algorithms():
+    """Names of the registered algorithms run when no algorithms are selected, all except opt-in ones."""
+    return [name for name, cls in IMPUTERS.items() if cls.default_sweep]
+
+
+class Imputer:
+    """
+    Common interface of all imputation algorithms. Subclasses declare their hyperparameters with defaults
+    in `default_params`, resource hints in `resources` and implement `fit_transform` on a float NumPy array
+    (rows x features) with NaN for missing values. The input array is never modified.
+
+    resources:
+    threads: number of threads the algorithm uses when it runs.
+    memory: how memory grows with the number of rows, 'linear' or 'quadratic'.
+
+    default_sweep: whether the algorithm runs when no algorithms are selected, opt-in algorithms only run by name.
+    """
+    name = None
+    default_params = {}
+    resources = {'threads': 1, 'memory': 'linear'}
+    default_sweep = True
+
+    def __init__(self, **params):
+        unknown = set(params) - set(self.default_params)
+        if unknown:
+            raise ValueError(f"Unknown hyperparameters {sorted(unknown)} for {self.name}.")
+        self.params = {**self.default_params, **params}
+
+    @property
+    def threads(self):
+        return self.params.get('n_jobs', self.resources['threads'])
+
+    @property
+    def uses_neighbour_index(self):
+        return self.params.get('use_neighbour_index', False)
+
+    def shared_index(self, name, reference):
+        """
+        Index of the complete data `reference` of a combination passed to `fit_transform`, built once per process
+        and shared by all cells of the combination registered under `name`. Neighbour index for imputers
+        with `use_neighbour_index`, None for imputers without index.
+        """
+        return shared_index(name, reference) if self.uses_neighbour_index else None
+
+    def fit_transform(self, X, index=None):
+        """
+        Params:
+        X (np.ndarray): data (rows x features) with NaN for missing values.
+        index: index of the complete data X was masked from, see `shared_index`.
+
+        return: new array with missing values imputed.
+        """
+        raise NotImplementedError
+
+
+@register_imputer
+class KNNImpute(Imputer):
+    """Mean of the `n_neighbors` nearest rows observed in each column."""
+    name = 'KNN'
+    default_params = {'n_neighbors': 10, 'use_neighbour_index': False}
+    resources = {'threads': 1, 'memory': 'quadratic'}
+
+    def fit_transform(self, X, index=None):
+        if index is not None and self.uses_neighbour_index:
+            # Distances derived from the precomputed neighbour index of the complete combination data
+            return index.knn_impute(np.isnan(X) & index.present, self.params['n_neighbors'])
+        return KNNImputer(n_neighbors=self.params['n_neighbors']).fit_transform(X)
+
+
+def _impute_pattern_blocks(X, imputed, patterns, column, fit_predict):
+    """
+    Imputes `column` block by block of its missingness patterns. Each block is predicted from the columns observed
+    in its rows by a model trained on the rows where the column and all of these columns are observed, so no
+    missing feature value is ever filled in or passed to the model.
+
+    Params:
+    X (np.ndarray): data (rows x features) with NaN for missing values.
+    imputed (np.ndarray): output array, rows of `column` are filled in place.
+    patterns (MissingnessPatterns): missingness patterns of X.
+    column (int): column to impute.
+    fit_predict: function (training features, training targets, block features) -> predictions of the block.
+    """
+    for rows, features in patterns.column_blocks(column):
+        train = patterns.observed_rows([column, *features])
+        if train.size == 0:
+            # No row has the column together with these features, the block gets the mean of the column
+            observed = patterns.observed_rows([column])
+            imputed[rows, column] = X[observed, column].mean() if observed.size else np.nan
+        elif features.size == 0:
+            imputed[rows, column] = X[train, column].mean()
+        else:
+            imputed[rows, column] = fit_predict(X[np.ix_(train, features)], X[train, column], X[np.ix_(rows, features)])
+
+
+@register_imputer
+class RandomForestImpute(Imputer):
+    """
+    One random forest per column, trained on the rows where the column is observed with the other
+    columns (including their missing values) as features. With `pattern_features` one forest per column and
+    missingness pattern uses only the columns observed in the pattern rows. With `multi_output` one forest
+    per missingness pattern predicts all missing columns of its rows at once.
+    """
+    name = 'RandomForest'
+    default_params = {'n_estimators': 200, 'max_depth': 10, 'random_state': 20, 'pattern_features': False,
+                      'multi_output': False, 'min_pattern_rows': 10}
+
+    def _regressor(self, targets=None):
+        return RandomForestRegressor(n_estimators=self.params['n_estimators'], max_depth=self.params['max_depth'],
+                                     random_state=self.params['random_state'])
+
+    def _fit_predict(self, X_train, y_train, X_predict):
+        return self._regressor().fit(X_train, y_train).predict(X_predict)
+
+    def fit_transform(self, X, index=None):
+        patterns = MissingnessPatterns(np.isnan(X))
+        if self.params['multi_output']:
+            # One multi-output forest per missingness pattern, see impute_by_pattern_forests
+            return impute_by_pattern_forests(X, patterns.missing, self._regressor, min_pattern_rows=self.params['min_pattern_rows'],
+                                             patterns=patterns)
+        imputed = X.copy()
+        for i in range(X.shape[1]):
+            if self.params['pattern_features']:
+                _impute_pattern_blocks(X, imputed, patterns, i, self._fit_predict)
+                continue
+            rows = patterns.missing_rows(i)
+            if not rows.size:
+                continue
+            features = np.arange(X.shape[1]) != i
+            train = patterns.observed_rows([i])
+            imputed[rows, i] = self._fit_predict(X[train][:, features], X[train, i], X[rows][:, features])
+        return imputed
+
+
+class LeaveOneColumnOutScaler:
+    """
+    Mean imputation and standardization of the other columns for every target column of one input matrix, equal to
+    SimpleImputer(strategy='mean') followed by StandardScaler fitted on the rows where the target is observed.
+    Counts, sums and sums of squares of every column over the observed rows of every target come from one pass of
+    matrix products, each target only slices them. Scaled features are written to one reused buffer.
+    """
+    def __init__(self, X):
+        self.present = ~np.isnan(X)
+        # Shifted by the column means, so that sums of squares keep their precision
+        self.center = np.array([X[self.present[:, j], j].mean() if self.present[:, j].any() else 0.0 for j in range(X.shape[1])])
+        self._shifted = np.where(self.present, X - self.center, 0.0)
+        present = self.present.astype(float)
+        # [i, j]: count, sum and sum of squares of column j over rows where both i and j are observed
+        self.counts = present.T @ present
+        sums = present.T @ self._shifted
+        squares = present.T @ self._shifted ** 2
+        n_train = np.diag(self.counts)[:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.means = sums / self.counts
+            # Imputed values equal the mean and add nothing to the variance over the training rows
+            variance = np.clip(squares - sums * self.means, 0.0, None) / n_train
+        # Constant columns keep scale 1 like StandardScaler, up to the rounding error of the variance
+        eps = np.finfo(float).eps
+        constant = variance <= 10 * eps * (n_train * eps * variance + (n_train * (np.abs(self.means) + np.abs(self.center)) * eps) ** 2)
+        self.scales = np.where(constant | ~np.isfinite(variance), 1.0, np.sqrt(variance))
+        self._buffer = np.empty(X.size)
+
+    def features(self, column):
+        """Other columns used as features of target `column`, columns never observed with it are left out like SimpleImputer does."""
+        features = self.counts[column] > 0
+        features[column] = False
+        return np.flatnonzero(features)
+
+    def transform(self, column, rows):
+        """
+        Mean-imputed and standardized features of target `column` for `rows`, as a contiguous view of the shared
+        buffer which is valid until the next call.
+        """
+        features = self.features(column)
+        out = self._buffer[:len(rows) * len(features)].reshape(len(rows), len(features))
+        np.subtract(self._shifted[np.ix_(rows, features)], self.means[column, features], out=out)
+        out /= self.scales[column, features]
+        out[~self.present[np.ix_(rows, features)]] = 0.0
+        return out
+
+
+@register_imputer
+class SVMImpute(Imputer):
+    """
+    One support vector regressor per column on mean-imputed and standardized other columns,
+    trained on the rows where the column is observed. With `pattern_features` one regressor per column and
+    missingness pattern uses only the standardized columns observed in the pattern rows, without mean imputation.
+    """
+    name = 'SVM'
+    default_params = {'pattern_features': False}
+    resources = {'threads': 1, 'memory': 'quadratic'}
+
+    @staticmethod
+    def _fit_predict(X_train, y_train, X_predict):
+        scaler = StandardScaler()
+        model = SVR().fit(scaler.fit_transform(X_train), y_train)
+        return model.predict(scaler.transform(X_predict))
+
+    def fit_transform(self, X, index=None):
+        patterns = MissingnessPatterns(np.isnan(X))
+        imputed = X.copy()
+        scaler = LeaveOneColumnOutScaler(X)
+        for i in range(X.shape[1]):
+            if self.params['pattern_features']:
+                _impute_pattern_blocks(X, imputed, patterns, i, self._fit_predict)
+                continue
+            rows = patterns.missing_rows(i)
+            if not rows.size:
+                continue
+            train = patterns.observed_rows([i])
+            model = SVR()
+            model.fit(scaler.transform(i, train), X[train, i])
+            imputed[rows, i] = model.predict(scaler.transform(i, rows))
+        return imputed
+
+
+@register_imputer
+class ApproximateSVMImpute(Imputer):
+    """
+    SVM imputation for large tables. The RBF kernel of SVR (same gamma='scale') is approximated by Nystroem or random
+    Fourier features of the mean-imputed and standardized other columns, and a linear solver is fit on them, so
+    training grows linearly with the number of rows instead of quadratically to cubically.
+
+    approximation: 'nystroem' or 'fourier'.
+    solver: 'linear_svr' (squared epsilon-insensitive loss) or 'ridge'.
+
+    Opt-in, not part of the default sweep: select it by name, e.g. `--algorithms SVM_Approx`.
+    """
+    name = 'SVM_Approx'
+    default_sweep = False
+    default_params = {'approximation': 'nystroem', 'n_components': 300, 'solver': 'linear_svr', 'C': 1.0, 'epsilon': 0.1,
+                      'random_state': 0}
+
+    def _feature_map(self, n_features, variance, n_rows):
+        gamma = 1.0 / (n_features * variance) if variance > 0 else 1.0
+        if self.params['approximation'] == 'nystroem':
+            return Nystroem(gamma=gamma, n_components=min(self.params['n_components'], n_rows), random_state=self.params['random_state'])
+        if self.params['approximation'] == 'fourier':
+            return RBFSampler(gamma=gamma, n_components=self.params['n_components'], random_state=self.params['random_state'])
+        raise ValueError(f"Unknown kernel approximation '{self.params['approximation']}'. Choose 'nystroem' or 'fourier'.")
+
+    def _regressor(self):
+        if self.params['solver'] == 'linear_svr':
+            return LinearSVR(C=self.params['C'], epsilon=self.params['epsilon'], loss='squared_epsilon_insensitive', dual=False,
+                             max_iter=10000)
+        if self.params['solver'] == 'ridge':
+            return Ridge(alpha=1.0 / self.params['C'])
+        raise ValueError(f"Unknown solver '{self.params['solver']}'. Choose 'linear_svr' or 'ridge'.")
+
+    def fit_transform(self, X, index=None):
+        patterns = MissingnessPatterns(np.isnan(X))
+        imputed = X.copy()
+        scaler = LeaveOneColumnOutScaler(X)
+        for i in range(X.shape[1]):
+            rows = patterns.missing_rows(i)
+            if not rows.size:
+                continue
+            train = patterns.observed_rows([i])
+            features_scaled = scaler.transform(i, train)
+            feature_map = self._feature_map(features_scaled.shape[1], features_scaled.var(), len(train))
+            # Targets are centered for LinearSVR, liblinear regularizes its intercept (Ridge fits it unpenalized)
+            target_mean = X[train, i].mean()
+            model = self._regressor()
+            model.fit(feature_map.fit_transform(features_scaled), X[train, i] - target_mean)
+            imputed[rows, i] = model.predict(feature_map.transform(scaler.transform(i, rows))) + target_mean
+        return imputed
+
+
+@register_imputer
+class RandomForestMICEImpute(Imputer):
+    """
+    Chained equations (IterativeImputer) with a random forest estimator in every round. engine 'native' runs
+    ChainedEquationsImputer instead, linear Bayesian ridge rounds and a final random forest round. It does not
+    reproduce the IterativeImputer results, so it is opt-in.
+    """
+    name = 'RandomForest_MICE'
+    default_params = {'max_iter': 25, 'tol': 0.05, 'random_state': 0, 'n_estimators': 100, 'engine': 'sklearn'}
+
+    def fit_transform(self, X, index=None):
+        if self.params['engine'] == 'native':
+            imputer = ChainedEquationsImputer(max_iter=self.params['max_iter'], tol=self.params['tol'],
+                                              n_estimators=self.params['n_estimators'], random_state=self.params['random_state'])
+            return imputer.fit_transform(X)
+        if self.params['engine'] != 'sklearn':
+            raise ValueError(f"Unknown MICE engine '{self.params['engine']}'. Choose 'native' or 'sklearn'.")
+        rf_imputer = IterativeImputer(estimator=RandomForestRegressor(n_estimators=self.params['n_estimators']), max_iter=self.params['max_iter'],
+                                      tol=self.params['tol'], random_state=self.params['random_state'])
+        return rf_imputer.fit_transform(X)
+
+
+@register_imputer
+class HybridKNNRandomForestImpute(Imputer):
+    """KNN imputation refined iteratively with per-column random forests, see HybridKNNRandomForestImputer."""
+    name = 'HybridKNN_RF'
+    default_params = {'n_neighbors': 5, 'n_estimators': 100, 'max_iterations': 10, 'threshold': 1e-4,
+                      'incremental': False, 'parallel_columns': False, 'multi_output': False, 'min_pattern_rows': 10,
+                      'n_jobs': 1, 'use_neighbour_index': False}
+    resources = {'threads': 1, 'memory': 'quadratic'}
+
+    def fit_transform(self, X, index=None):
+        params = {key: value for key, value in self.params.items() if key != 'use_neighbour_index'}
+        imputer = HybridKNNRandomForestImputer(**params, neighbour_index=index if self.uses_neighbour_index else None)
+        return imputer.fit_transform(X)
+
+
+@register_imputer
+class CorrelationRegressionImpute(Imputer):
+    """
+    One correlation-weighted ridge regression per column on all of its significantly correlated columns,
+    see impute_correlation_regression.
+    """
+    name = 'CorrelationRegression'
+    default_params = {'alpha': 1.0, 'min_corr': 0.5, 'max_p_value': 0.05, 'use_shared_statistics': True}
+
+    def shared_index(self, name, reference):
+        # Sums and cross products of the complete data, downdated by the rows each cell does not train on
+        return shared_statistics(name, reference) if self.params['use_shared_statistics'] else None
+
+    def fit_transform(self, X, index=None):
+        params = {key: value for key, value in self.params.items() if key != 'use_shared_statistics'}
+        return impute_correlation_regression(X, statistics=index if self.params['use_shared_statistics'] else None, **params)
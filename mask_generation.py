@@ -0,0 +1,51 @@
+import numpy as np
+
+
+def _uniform_draws(seed, n_positions, n_rows, legacy):
+    """
+    Uniform draws of one seed as (positions x rows) array. In legacy mode the draws equal the ones made by
+    `np.random.seed(seed)` followed by one `np.random.rand(n_rows)` per removed column, without touching
+    global random state. Otherwise an independent `np.random.Generator` stream is used per seed.
+    """
+    if legacy:
+        return np.random.RandomState(seed).rand(n_positions * n_rows).reshape(n_positions, n_rows)
+    return np.random.default_rng(seed).random((n_positions, n_rows))
+
+
+def generate_masks(n_rows, n_positions, percentages, seeds, legacy=True):
+    """
+    Generates removal masks of all seeds and percentages in one vectorized pass.
+
+    Params:
+    n_rows (int): number of rows of the combination data.
+    n_positions (int): maximum number of columns removed at once, i.e. number of feature columns.
+    percentages (list): percentages of data to remove.
+    seeds (list): random seeds for reproducibility of results.
+    legacy (bool): reproduce masks of the old per-column `remove_data()` loop exactly.
+
+    Returns:
+    np.ndarray: Boolean tensor (seeds x percentages x positions x rows). Position k holds the mask of the
+    k-th column of a removed subset, so a subset reuses the same draws as the old loop did.
+    """
+    draws = np.stack([_uniform_draws(seed, n_positions, n_rows, legacy) for seed in seeds])
+    thresholds = np.asarray(percentages, dtype=float) / 100.0
+    return draws[:, None, :, :] < thresholds[None, :, None, None]
+
+
+def subset_masks(masks, features, subset):
+    """
+    Builds cell masks of one column subset from the tensor of `generate_masks`.
+
+    Params:
+    masks (np.ndarray): boolean tensor (seeds x percentages x positions x rows).
+    features (list): feature columns of the combination, in order.
+    subset (tuple): columns from which data is removed.
+
+    Returns:
+    np.ndarray: Boolean tensor (seeds x percentages x rows x features), True where data is removed.
+    """
+    n_seeds, n_percentages, _, n_rows = masks.shape
+    cell_masks = np.zeros((n_seeds, n_percentages, n_rows, len(features)), dtype=bool)
+    for position, column in enumerate(subset):
+        cell_masks[..., features.index(column)] = masks[:, :, position, :]
+    return cell_masks
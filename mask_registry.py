@@ -0,0 +1,162 @@
+import os
+import numpy as np
+import pandas as pd
+
+from artifact_store import ArtifactKey
+
+
+def registry_path(base_dir, dataset):
+    """Returns path of mask registry file of a dataset inside data_impute_project directory."""
+    return os.path.join(base_dir, 'artifacts', dataset, 'masks.npz')
+
+
+class MaskedView:
+    """
+    Lazy view of one experiment cell: reference combination data with the cell's mask applied.
+    The packed mask is only unpacked, and the NaN-ed frame only built, when they are requested.
+    """
+    def __init__(self, key, reference, packed):
+        self.key = key
+        self.reference = reference
+        self.packed = packed
+        self._mask = None
+
+    @property
+    def columns(self):
+        return list(self.reference.columns[1:])
+
+    @property
+    def mask(self):
+        """Boolean array (rows x feature columns), True where data was removed."""
+        if self._mask is None:
+            shape = (len(self.reference), len(self.columns))
+            self._mask = np.unpackbits(self.packed, count=shape[0] * shape[1]).reshape(shape).astype(bool)
+        return self._mask
+
+    def column_mask(self, column):
+        return self.mask[:, self.columns.index(column)]
+
+    def values(self):
+        """Returns feature values as float array with removed cells set to NaN."""
+        values = self.reference[self.columns].to_numpy(dtype=float, copy=True)
+        values[self.mask] = np.nan
+        return values
+
+    def to_frame(self):
+        """Materializes the NaN-ed DataFrame, equivalent to the old missing_data.xlsx of the cell."""
+        df = self.reference.copy()
+        df[self.columns] = self.values()
+        return df
+
+
+class MaskRegistry:
+    """
+    Missingness of all experiment cells of a dataset stored as one bit-packed boolean mask per
+    (combination, feature_set, percentage, seed) alongside a single reference copy of each
+    combination file. The first column of a reference frame is the ID column, masks cover the rest.
+    """
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self._references = {}
+        self._masks = {}
+
+    def add_reference(self, combination, df):
+        self._references[combination] = df.reset_index(drop=True)
+
+    def reference(self, combination):
+        return self._references[combination]
+
+    def combinations(self):
+        return sorted(self._references)
+
+    def add(self, key, mask):
+        """
+        Registers mask of an experiment cell.
+
+        Params:
+        key (ArtifactKey): cell of the mask, algorithm is ignored.
+        mask (np.ndarray): boolean array (rows x feature columns) of the combination reference, True where data is removed.
+        """
+        reference = self._references[key.combination]
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != (len(reference), reference.shape[1] - 1):
+            raise ValueError(f"Mask shape {mask.shape} does not match reference of {key.combination}.")
+        self._masks[key._replace(dataset=self.dataset, algorithm=None)] = np.packbits(mask.ravel())
+
+    def keys(self):
+        return sorted(self._masks, key=lambda key: (key.combination, len(key.feature_set), key.feature_set, key.percentage, key.seed))
+
+    def exists(self, key):
+        return key._replace(algorithm=None) in self._masks
+
+    def view(self, key):
+        key = key._replace(algorithm=None)
+        return MaskedView(key, self._references[key.combination], self._masks[key])
+
+    def save(self, path):
+        """Writes references and packed masks of all cells into a single .npz container."""
+        arrays = {}
+        for combination, reference in self._references.items():
+            arrays[f'{combination}.columns'] = np.array(reference.columns, dtype=str)
+            arrays[f'{combination}.ids'] = reference.iloc[:, 0].to_numpy(dtype=str)
+            arrays[f'{combination}.values'] = reference.iloc[:, 1:].to_numpy(dtype=float)
+            keys = [key for key in self.keys() if key.combination == combination]
+            arrays[f'{combination}.feature_sets'] = np.array([key.feature_set for key in keys], dtype=str)
+            arrays[f'{combination}.percentages'] = np.array([key.percentage for key in keys], dtype=int)
+            arrays[f'{combination}.seeds'] = np.array([key.seed for key in keys], dtype=int)
+            packed_len = (reference.shape[0] * (reference.shape[1] - 1) + 7) // 8
+            arrays[f'{combination}.masks'] = np.stack([self._masks[key] for key in keys]) if keys else np.empty((0, packed_len), dtype=np.uint8)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path, dataset):
+        registry = cls(dataset)
+        with np.load(path) as container:
+            combinations = sorted({name.rsplit('.', 1)[0] for name in container.files})
+            for combination in combinations:
+                columns = list(container[f'{combination}.columns'])
+                reference = pd.DataFrame(container[f'{combination}.values'], columns=columns[1:])
+                reference.insert(0, columns[0], container[f'{combination}.ids'])
+                registry.add_reference(combination, reference)
+                cells = zip(container[f'{combination}.feature_sets'], container[f'{combination}.percentages'],
+                            container[f'{combination}.seeds'], container[f'{combination}.masks'])
+                for feature_set, percentage, seed, packed in cells:
+                    key = ArtifactKey(dataset, combination, str(feature_set), int(percentage), int(seed), None)
+                    registry._masks[key] = packed
+        return registry
+
+    @classmethod
+    def open(cls, base_dir, dataset):
+        """Loads mask registry of a dataset, or returns an empty one if it was not created yet."""
+        path = registry_path(base_dir, dataset)
+        if os.path.exists(path):
+            return cls.load(path, dataset)
+        return cls(dataset)
+
+    @classmethod
+    def from_store(cls, store, dataset, references):
+        """
+        Builds registry from missing data saved in an artifact store, e.g. the legacy Excel tree.
+
+        Params:
+        store: artifact store containing the missing data of the dataset.
+        dataset (str): dataset type.
+        references (dict): combination name -> complete combination DataFrame.
+        """
+        registry = cls(dataset)
+        for combination, df in references.items():
+            registry.add_reference(combination, df)
+        for key in store.keys(dataset):
+            if key.combination in references:
+                missing = store.load(key).iloc[:, 1:].isna().to_numpy()
+                registry.add(key, missing & registry.reference(key.combination).iloc[:, 1:].notna().to_numpy())
+        return registry
+
+
+def export_missing_data(registry, store):
+    """Materializes every cell of the registry as missing data frame into an artifact store."""
+    for key in registry.keys():
+        store.save(key, registry.view(key).to_frame())
+    store.flush()
+    return len(registry.keys())
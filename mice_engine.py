@@ -0,0 +1,152 @@
+import time
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+
+def bayesian_ridge_fit(xtx, xty, yty, n_samples, max_iter=300, tol=1e-3, alpha_1=1e-6, alpha_2=1e-6, lambda_1=1e-6, lambda_2=1e-6):
+    """
+    Bayesian ridge regression (evidence maximization like sklearn BayesianRidge) from the sufficient statistics
+    of centered training data, so that no pass over the training rows is needed.
+
+    Params:
+    xtx (np.ndarray): cross products of the centered predictors (predictors x predictors).
+    xty (np.ndarray): cross products of the centered predictors with the centered target (predictors).
+    yty (float): sum of squares of the centered target.
+    n_samples (int): number of training rows.
+    max_iter, tol, alpha_1, alpha_2, lambda_1, lambda_2: like BayesianRidge.
+
+    return: coefficients of the predictors.
+    """
+    eigen_vals, eigen_vecs = np.linalg.eigh(xtx)
+    eigen_vals = np.clip(eigen_vals, 0.0, None)
+    projected = eigen_vecs.T @ xty
+    alpha_ = 1.0 / (yty / n_samples + np.finfo(float).eps)
+    lambda_ = 1.0
+    coef_old = None
+    for iteration in range(max_iter):
+        coef = eigen_vecs @ (projected / (eigen_vals + lambda_ / alpha_))
+        # Residual sum of squares expanded in the sufficient statistics
+        rss = max(yty - 2 * coef @ xty + coef @ xtx @ coef, 0.0)
+        gamma_ = np.sum(alpha_ * eigen_vals / (lambda_ + alpha_ * eigen_vals))
+        lambda_ = (gamma_ + 2 * lambda_1) / (np.sum(coef ** 2) + 2 * lambda_2)
+        alpha_ = (n_samples - gamma_ + 2 * alpha_1) / (rss + 2 * alpha_2)
+        if coef_old is not None and np.sum(np.abs(coef_old - coef)) < tol:
+            break
+        coef_old = coef
+    return eigen_vecs @ (projected / (eigen_vals + lambda_ / alpha_))
+
+
+class ChainedEquationsImputer:
+    def __init__(self, max_iter=25, tol=1e-3, final_estimator='random_forest', n_estimators=100, max_depth=None,
+                 random_state=0, verbose=False):
+        """
+        Multiple imputation by chained equations. Columns are imputed one after another (fewest missing values first)
+        from all other columns, starting from column means. Rounds use Bayesian ridge regressions solved from the
+        Gram matrix of the current imputation, which is kept up to date with rank updates of the changed cells
+        instead of being recomputed. After the linear rounds converged, one refinement round with random forests
+        captures non-linear relations.
+
+        Params:
+        max_iter: maximum number of linear rounds.
+        tol: convergence criteria, like IterativeImputer rounds stop when the largest absolute row sum of changes
+        is below `tol` times the largest absolute observed value.
+        final_estimator: 'random_forest' for a final forest refinement round, None to stop after the linear rounds.
+        n_estimators: number of trees of the forests of the refinement round.
+        max_depth: maximum depth of the trees of the refinement round.
+        random_state: random seed of the forests.
+        verbose: print convergence of every round.
+        """
+        self.max_iter = max_iter
+        self.tol = tol
+        self.final_estimator = final_estimator
+        self.n_estimators = n_estimators
+        self.max_depth = max_depth
+        self.random_state = random_state
+        self.verbose = verbose
+        # Per-round metrics of the last call to fit_transform
+        self.history_ = []
+
+    def _report(self, round_number, estimator, start_time, change, normalized_tol):
+        entry = {'round': round_number, 'estimator': estimator, 'seconds': time.time() - start_time,
+                 'change': change, 'converged': change < normalized_tol}
+        self.history_.append(entry)
+        if self.verbose:
+            print(f"[MICE] round {round_number} ({estimator}), change {change:.6g}, tolerance {normalized_tol:.6g}, "
+                  f"{entry['seconds']:.3f} seconds")
+
+    def _update_column(self, Z, gram, sums, rows, column, values):
+        """Writes `values` to rows of `column` of Z and updates its Gram matrix and column sums with the change."""
+        delta = values - Z[rows, column]
+        update = delta @ Z[rows]
+        update[column] = np.sum(values ** 2 - Z[rows, column] ** 2)
+        gram[column] += update
+        gram[:, column] += update
+        gram[column, column] -= update[column]
+        sums[column] += delta.sum()
+        Z[rows, column] = values
+
+    def fit_transform(self, X):
+        """
+        Params:
+        X: data (rows x features) with NaN for missing values.
+
+        return: new array with missing values imputed.
+        After the call `history_` holds one dict per round with the estimator used, runtime in seconds,
+        change of the imputation (largest absolute row sum) and whether it was below the tolerance.
+        """
+        if self.final_estimator not in ('random_forest', None):
+            raise ValueError(f"Unknown final estimator '{self.final_estimator}'. Choose 'random_forest' or None.")
+        missing = np.isnan(X)
+        self.history_ = []
+        n_rows = X.shape[0]
+        # Fewest missing values first, complete columns are never imputed
+        order = [i for i in np.argsort(missing.mean(axis=0), kind='mergesort') if missing[:, i].any()]
+        normalized_tol = self.tol * np.max(np.abs(X[~missing])) if (~missing).any() else 0.0
+
+        # Shifted by the observed column means, so that the Gram matrix keeps its precision
+        center = np.nan_to_num(np.nanmean(X, axis=0)) if (~missing).any() else np.zeros(X.shape[1])
+        Z = np.where(missing, 0.0, X - center)
+        gram = Z.T @ Z
+        sums = Z.sum(axis=0)
+        rows_of = {i: np.flatnonzero(missing[:, i]) for i in order}
+
+        for round_number in range(1, self.max_iter + 1):
+            start_time = time.time()
+            previous = Z.copy()
+            for i in order:
+                rows = rows_of[i]
+                others = np.arange(X.shape[1]) != i
+                n_train = n_rows - rows.size
+                if n_train == 0:
+                    continue
+                # Statistics of the training rows: all rows minus the rows where the column is missing
+                block = Z[rows]
+                train_gram = gram - block.T @ block
+                train_sums = sums - block.sum(axis=0)
+                mean = train_sums / n_train
+                centered_gram = train_gram - n_train * np.outer(mean, mean)
+                coef = bayesian_ridge_fit(centered_gram[np.ix_(others, others)], centered_gram[others, i],
+                                          centered_gram[i, i], n_train)
+                values = mean[i] + (block[:, others] - mean[others]) @ coef
+                self._update_column(Z, gram, sums, rows, i, values)
+            change = np.max(np.abs(Z - previous).sum(axis=1)) if order else 0.0
+            self._report(round_number, 'bayesian_ridge', start_time, change, normalized_tol)
+            if change < normalized_tol:
+                break
+
+        # A single column has no predictors, it keeps the mean of the linear rounds
+        if self.final_estimator == 'random_forest' and order and X.shape[1] > 1:
+            start_time = time.time()
+            previous = Z.copy()
+            for i in order:
+                rows = missing[:, i]
+                if rows.all():
+                    continue
+                features = np.delete(Z, i, axis=1)
+                model = RandomForestRegressor(n_estimators=self.n_estimators, max_depth=self.max_depth,
+                                              random_state=self.random_state)
+                model.fit(features[~rows], Z[~rows, i])
+                Z[rows, i] = model.predict(features[rows])
+            self._report(len(self.history_) + 1, 'random_forest', start_time, np.max(np.abs(Z - previous).sum(axis=1)), normalized_tol)
+
+        return Z + center
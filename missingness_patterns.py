@@ -0,0 +1,50 @@
+import numpy as np
+
+
+class MissingnessPatterns:
+    """
+    Rows of a matrix grouped by their missingness pattern (the set of missing columns, encoded as bitmask),
+    computed once so that imputers can work on whole pattern blocks instead of selecting rows column by column.
+    """
+    def __init__(self, missing):
+        """
+        Params:
+        missing (np.ndarray): boolean mask (rows x features), True where a value is missing.
+        """
+        self.missing = np.asarray(missing, dtype=bool)
+        n_columns = self.missing.shape[1]
+        codes = self.missing.astype(np.int64) @ (np.int64(1) << np.arange(n_columns, dtype=np.int64))
+        self.codes, inverse, self.counts = np.unique(codes, return_inverse=True, return_counts=True)
+        # Row indices of every pattern, in order of the codes
+        order = np.argsort(inverse, kind='stable')
+        self.rows = np.split(order, np.cumsum(self.counts)[:-1])
+        self.columns = [np.flatnonzero((code >> np.arange(n_columns)) & 1) for code in self.codes]
+
+    def __len__(self):
+        return len(self.codes)
+
+    def incomplete(self):
+        """(code, missing columns, rows) of every pattern with at least one missing column."""
+        return [(code, columns, rows) for code, columns, rows in zip(self.codes, self.columns, self.rows) if columns.size]
+
+    def observed_rows(self, columns):
+        """Sorted indices of the rows where all `columns` are observed, combined from the patterns instead of a scan of the matrix."""
+        mask = np.bitwise_or.reduce(np.int64(1) << np.asarray(columns, dtype=np.int64), initial=np.int64(0))
+        selected = [rows for code, rows in zip(self.codes, self.rows) if not code & mask]
+        return np.sort(np.concatenate(selected)) if selected else np.array([], dtype=np.intp)
+
+    def missing_rows(self, column):
+        """Sorted indices of the rows where `column` is missing."""
+        bit = np.int64(1) << np.int64(column)
+        selected = [rows for code, rows in zip(self.codes, self.rows) if code & bit]
+        return np.sort(np.concatenate(selected)) if selected else np.array([], dtype=np.intp)
+
+    def column_blocks(self, column):
+        """
+        Pattern blocks of the rows where `column` is missing, as (rows, observed columns) with the columns observed
+        in the block rows, so that each block can be predicted from contiguous arrays of its observed features.
+        """
+        bit = np.int64(1) << np.int64(column)
+        n_columns = self.missing.shape[1]
+        return [(rows, np.setdiff1d(np.arange(n_columns), columns)) for code, columns, rows in zip(self.codes, self.columns, self.rows)
+                if code & bit]
@@ -0,0 +1,97 @@
+import numpy as np
+from joblib import Parallel, delayed
+
+from missingness_patterns import MissingnessPatterns
+
+
+def plan_pattern_fits(patterns, columns=None, min_pattern_rows=1):
+    """
+    Plans one multi-output fit per missingness pattern. A pattern with fewer than `min_pattern_rows` rows, which is
+    missing a subset of the columns of another pattern, is predicted by the fit of the pattern with fewest missing
+    columns among the frequent or maximal patterns missing all of its columns (it then uses fewer features),
+    so that rare patterns do not need their own forest.
+
+    Params:
+    patterns (MissingnessPatterns): rows grouped by missingness pattern.
+    columns (list): columns to impute, defaults to all. Other columns of a pattern are left as they are.
+    min_pattern_rows (int): minimum number of rows of a pattern to get its own fit.
+
+    return: list of (target columns, [(rows, target columns to fill)]) with one entry per fit.
+    """
+    selected = None if columns is None else np.asarray(list(columns))
+    blocks = []
+    for code, missing_columns, rows in patterns.incomplete():
+        targets = missing_columns if selected is None else np.intersect1d(missing_columns, selected)
+        if targets.size:
+            blocks.append((frozenset(targets.tolist()), rows))
+
+    # Frequent patterns and patterns no other pattern covers get their own fit
+    all_targets = {targets for targets, _ in blocks}
+    hosts = {targets for targets, rows in blocks if len(rows) >= min_pattern_rows}
+    hosts |= {targets for targets in all_targets if not any(targets < other for other in all_targets)}
+    fits = {}
+    for targets, rows in blocks:
+        if targets in hosts:
+            fits.setdefault(targets, []).append((rows, targets))
+    for targets, rows in blocks:
+        if targets not in hosts:
+            host = min((candidate for candidate in hosts if targets < candidate), key=lambda candidate: (len(candidate), sorted(candidate)))
+            fits[host].append((rows, targets))
+    return [(np.array(sorted(targets)), [(rows, np.array(sorted(served))) for rows, served in served_blocks])
+            for targets, served_blocks in fits.items()]
+
+
+def _fit_predict_pattern(regressor, values, missing, targets, blocks):
+    """Fits one multi-output regressor of `targets` and predicts the rows of all blocks it serves."""
+    features = np.setdiff1d(np.arange(values.shape[1]), targets)
+    train = ~missing[:, targets].any(axis=1)
+    if not train.any() or features.size == 0:
+        # Nothing to learn from, columns fall back to their observed mean
+        means = np.array([values[~missing[:, t], t].mean() if (~missing[:, t]).any() else 0.0 for t in targets])
+        return [np.tile(means, (len(rows), 1)) for rows, _ in blocks]
+    # Targets are standardized so that the split criteria weighs all of them equally
+    y = values[train][:, targets]
+    y_mean = y.mean(axis=0)
+    y_scale = y.std(axis=0)
+    y_scale[y_scale == 0] = 1.0
+    y = (y - y_mean) / y_scale
+    # A single target is fit as 1-d array, sklearn warns on column vectors
+    regressor.fit(values[train][:, features], y.ravel() if len(targets) == 1 else y)
+    predictions = []
+    for rows, _ in blocks:
+        predicted = regressor.predict(values[rows][:, features]).reshape(len(rows), len(targets))
+        predictions.append(predicted * y_scale + y_mean)
+    return predictions
+
+
+def impute_by_pattern_forests(values, missing, make_regressor, columns=None, min_pattern_rows=1, n_jobs=1, patterns=None):
+    """
+    Imputes missing cells with one multi-output regressor per missingness pattern, predicting all missing columns
+    of the pattern rows at once from the other columns. Each regressor is trained on rows where all of its target
+    columns are observed.
+
+    Params:
+    values (np.ndarray): data (rows x features) used as features and targets. Observed cells must hold the observed
+    values, missing cells may hold NaN (if the regressor supports it) or a previous imputation.
+    missing (np.ndarray): boolean mask (rows x features) of the cells to impute.
+    make_regressor: function (target columns as tuple) -> unfitted regressor supporting multi-output fits.
+    columns (list): columns to impute, defaults to all.
+    min_pattern_rows (int): minimum number of rows of a pattern to get its own regressor, see plan_pattern_fits.
+    n_jobs (int): number of threads fitting regressors of different patterns concurrently.
+    patterns (MissingnessPatterns): precomputed patterns of `missing`.
+
+    return: new array with missing cells of `columns` imputed.
+    """
+    patterns = MissingnessPatterns(missing) if patterns is None else patterns
+    plan = plan_pattern_fits(patterns, columns, min_pattern_rows)
+    tasks = [(make_regressor(tuple(targets.tolist())), values, missing, targets, blocks) for targets, blocks in plan]
+    if n_jobs > 1:
+        results = Parallel(n_jobs=n_jobs, prefer='threads')(delayed(_fit_predict_pattern)(*task) for task in tasks)
+    else:
+        results = [_fit_predict_pattern(*task) for task in tasks]
+
+    imputed = values.copy()
+    for (targets, blocks), predictions in zip(plan, results):
+        for (rows, served), predicted in zip(blocks, predictions):
+            imputed[np.ix_(rows, served)] = predicted[:, np.searchsorted(targets, served)]
+    return imputed
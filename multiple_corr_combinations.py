@@ -1,9 +1,9 @@
 import os
 import pandas as pd
-from scipy.stats import pearsonr
-from itertools import combinations
 import numpy as np
 
+from correlation_engine import pairwise_correlations
+
 def classify_correlation(corr_coefficient, p_value, significance_level=0.05):
     """
     Classify strength of a correlation coefficient considering the p-value.
@@ -51,24 +51,10 @@ def calculate_and_save_correlation(base_path, result_base):
                 # Filter for numeric columns only
                 numeric_data = data.select_dtypes(include=[np.number])
 
-                # Prepare the DataFrame to store results
-                results = pd.DataFrame(columns=['Feature 1', 'Feature 2', 'Correlation Coefficient', 'P-Value', 'Classification'])
-
-                # Calculate correlations and p-values
-                for col1, col2 in combinations(numeric_data.columns, 2):
-                    # Drop rows where either column is NaN before correlation calculation
-                    subset = numeric_data[[col1, col2]].dropna()
-                    if not subset.empty:
-                        corr_coefficient, p_value = pearsonr(subset[col1], subset[col2])
-                        classification = classify_correlation(corr_coefficient, p_value)
-                        new_row = pd.DataFrame({
-                            'Feature 1': [col1],
-                            'Feature 2': [col2],
-                            'Correlation Coefficient': [corr_coefficient],
-                            'P-Value': [p_value],
-                            'Classification': [classification]
-                        })
-                        results = pd.concat([results, new_row], ignore_index=True)
+                # Pairwise-complete Pearson correlations and p-values of all column pairs in one vectorized pass
+                results = pairwise_correlations(numeric_data)
+                results['Classification'] = [classify_correlation(corr_coefficient, p_value) for corr_coefficient, p_value
+                                             in zip(results['Correlation Coefficient'], results['P-Value'])]
 
                 # Path for results to save in specified directory
                 relative_path = os.path.relpath(root, base_path)
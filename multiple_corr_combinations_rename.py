@@ -72,11 +72,11 @@
 
 import os
 import pandas as pd
-from scipy.stats import pearsonr
-from itertools import combinations
 import numpy as np
 
-def calculate_and_save_correlation(base_path, result_base):
+from correlation_engine import pairwise_correlations
+
+def calculate_and_save_correlation(base_path, result_base, method='pearson'):
     """
     Traverse directory starting at base_path, finds all Excel files, calculates Pearson correlation coefficients between pairs
     of variables, and saves the results in structured format in specified results directory.
@@ -84,6 +84,7 @@ def calculate_and_save_correlation(base_path, result_base):
     Params:
     base_path (str): root directory from which to start searching for Excel files.
     result_base (str): root directory where result files will be saved.
+    method (str): 'pearson' or 'spearman' correlation.
     """
     
     # Mapping from column letters to descriptive names
@@ -110,23 +111,8 @@ def calculate_and_save_correlation(base_path, result_base):
                 # Filter for numeric columns only
                 numeric_data = data.select_dtypes(include=[np.number])
 
-                # Prepare DataFrame to store results
-                results = pd.DataFrame(columns=['Feature 1', 'Feature 2', 'Correlation Coefficient', 'P-Value'])
-
-                # Calculate correlations and p-values
-                for col1, col2 in combinations(numeric_data.columns, 2):
-                    # Drop rows where either column is NaN before correlation calculation
-                    subset = numeric_data[[col1, col2]].dropna()
-                    if not subset.empty:
-                        # Calculate Pearson correlation coefficient and p-value
-                        corr_coefficient, p_value = pearsonr(subset[col1], subset[col2])
-                        new_row = pd.DataFrame({
-                            'Feature 1': [col1],
-                            'Feature 2': [col2],
-                            'Correlation Coefficient': [corr_coefficient],
-                            'P-Value': [p_value]
-                        })
-                        results = pd.concat([results, new_row], ignore_index=True)
+                # Pairwise-complete correlations and p-values of all column pairs in one vectorized pass
+                results = pairwise_correlations(numeric_data, method)
 
                 # Path for results to save in specified directory
                 relative_path = os.path.relpath(root, base_path)
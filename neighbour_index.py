@@ -0,0 +1,113 @@
+import numpy as np
+
+# Neighbour indexes built in the current process, keyed by name of the complete data (e.g. dataset/combination)
+_shared_indexes = {}
+
+
+class NeighbourIndex:
+    """
+    Nearest-neighbour engine over the complete data of a combination. Squared differences of every row pair
+    are computed once per column; the NaN-aware euclidean distances of the data with any removal mask applied
+    are then derived by subtracting the contributions of the removed cells, only for rows touched by the mask.
+    These distances differ from nan_euclidean_distances in their rounding, and on our rounded isotope values many
+    neighbours are (nearly) equidistant, so the chosen donors often differ from KNNImputer (on the removal masks
+    of all datasets, e.g. 2182 of 14332 imputed cells of human/combination_1 by up to 0.91, see knn_index_parity_check).
+    Imputers only use the index with `use_neighbour_index`, which is off by default.
+    """
+    def __init__(self, values, cache_columns=True):
+        """
+        Params:
+        values: complete data (rows x features), may itself contain NaN.
+        cache_columns: keep squared differences of every column (rows x rows x features floats) in memory.
+        If False they are recomputed for the rows touched by a mask, which needs far less memory on large tables.
+        """
+        self.values = np.asarray(values, dtype=float)
+        self.present = ~np.isnan(self.values)
+        n_rows, n_features = self.values.shape
+        self.squared_sum = np.zeros((n_rows, n_rows))
+        self._column_squares = [] if cache_columns else None
+        for c in range(n_features):
+            squares = self._column_squares_of(c, slice(None))
+            self.squared_sum += squares
+            if cache_columns:
+                self._column_squares.append(squares)
+        present = self.present.astype(float)
+        self.present_count = present @ present.T
+
+    def _column_squares_of(self, c, rows):
+        """Squared differences in column `c` between `rows` and all rows, zero where either value is NaN."""
+        if self._column_squares is not None and len(self._column_squares) > c:
+            return self._column_squares[c][rows]
+        column = np.where(self.present[:, c], self.values[:, c], 0.0)
+        squares = (column[rows, None] - column[None, :]) ** 2
+        squares *= self.present[rows, c][:, None] & self.present[None, :, c]
+        return squares
+
+    def distances(self, mask, rows):
+        """
+        NaN-aware euclidean distances of the data with `mask` applied, between `rows` and all rows.
+
+        Params:
+        mask: boolean array (rows x features), True where data is removed.
+        rows: indices of the rows for which distances are needed.
+
+        return: array (len(rows) x rows), NaN where two rows have no feature in common.
+        """
+        removed = mask & self.present
+        squared_sum = self.squared_sum[rows].copy()
+        count = self.present_count[rows].copy()
+        for c in np.flatnonzero(removed.any(axis=0)):
+            # Pairs which lose column c because one of the two values was removed
+            lost = (removed[rows, c][:, None] | removed[None, :, c]) & self.present[rows, c][:, None] & self.present[None, :, c]
+            squared_sum -= np.where(lost, self._column_squares_of(c, rows), 0.0)
+            count -= lost
+        with np.errstate(divide='ignore', invalid='ignore'):
+            distances = np.sqrt(np.maximum(squared_sum, 0.0) * self.values.shape[1] / count)
+        distances[count == 0] = np.nan
+        return distances
+
+    def knn_impute(self, mask, n_neighbors=5):
+        """
+        Imputes the data with `mask` applied from the uniform mean of the `n_neighbors` nearest rows
+        observed in each column, like KNNImputer. Receivers without any defined distance get the column mean.
+
+        return: imputed data (rows x features).
+        """
+        X = self.values.copy()
+        X[mask] = np.nan
+        missing = np.isnan(X)
+        imputed = X.copy()
+        rows = np.flatnonzero(missing.any(axis=1))
+        if rows.size == 0:
+            return imputed
+        distances = self.distances(mask, rows)
+        row_position = np.zeros(X.shape[0], dtype=int)
+        row_position[rows] = np.arange(rows.size)
+
+        for c in np.flatnonzero(missing.any(axis=0)):
+            receivers = np.flatnonzero(missing[:, c])
+            donors = np.flatnonzero(~missing[:, c])
+            if donors.size == 0:
+                continue
+            donor_values = X[donors, c]
+            dist = distances[row_position[receivers]][:, donors]
+
+            # Receivers with all NaN distances are imputed with the column mean
+            all_nan = np.isnan(dist).all(axis=1)
+            imputed[receivers[all_nan], c] = donor_values.mean()
+            receivers, dist = receivers[~all_nan], dist[~all_nan]
+            if receivers.size == 0:
+                continue
+
+            k = min(n_neighbors, donors.size)
+            nearest = np.argpartition(dist, k - 1, axis=1)[:, :k]
+            weights = ~np.isnan(np.take_along_axis(dist, nearest, axis=1))
+            imputed[receivers, c] = (donor_values[nearest] * weights).sum(axis=1) / weights.sum(axis=1)
+        return imputed
+
+
+def shared_index(name, values):
+    """Returns neighbour index of the complete data `values` registered under `name`, building it once per process."""
+    if name not in _shared_indexes:
+        _shared_indexes[name] = NeighbourIndex(values)
+    return _shared_indexes[name]
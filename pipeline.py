@@ -0,0 +1,221 @@
+import os
+import json
+import time
+import hashlib
+from contextlib import contextmanager
+
+
+def file_digest(path):
+    """sha256 of the content of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def expand_files(path):
+    """Files a declared path stands for: the file itself, or all files below a directory in sorted order."""
+    if os.path.isdir(path):
+        files = []
+        for directory, subdirs, filenames in os.walk(path):
+            subdirs.sort()
+            files.extend(os.path.join(directory, filename) for filename in sorted(filenames))
+        return files
+    return [path] if os.path.exists(path) else []
+
+
+@contextmanager
+def working_directory(path):
+    """Runs the enclosed code with `path` as current directory, so scripts with relative paths work from anywhere."""
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+class Stage:
+    """
+    One step of the pipeline.
+
+    Params:
+    name (str): unique stage name, e.g. removal/bird.
+    func: callable running the stage, without arguments.
+    inputs (list): files or directories the stage reads, including its own code.
+    outputs (list): files or directories the stage writes.
+    workdir (str): directory the stage is run from, relative to the pipeline root.
+    params (dict): arguments of `func` that change its outputs (JSON serializable), recorded with the input signatures.
+    """
+    def __init__(self, name, func, inputs, outputs, workdir='.', params=None):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.workdir = workdir
+        self.params = params or {}
+
+
+class Pipeline:
+    """
+    In-process runner of stages connected by their files. A stage depends on every stage producing one of its
+    inputs (or a directory containing it). A stage is run again only if an output is missing, its arguments changed
+    or the content of an input changed since its last successful run. Modification time and size of every input are recorded with its
+    sha256, so unchanged files are not hashed again and files rewritten with identical content do not trigger
+    their dependent stages.
+    """
+    def __init__(self, root, state_path):
+        """
+        Params:
+        root (str): directory all declared paths are relative to.
+        state_path (str): JSON file with arguments and input signatures of the last successful run of every stage.
+        """
+        self.root = root
+        self.state_path = state_path
+        self.stages = {}
+        self.state = {}
+        if os.path.exists(state_path):
+            with open(state_path) as f:
+                self.state = json.load(f)
+
+    def add(self, name, func, inputs, outputs, workdir='.', params=None):
+        if name in self.stages:
+            raise ValueError(f"Stage '{name}' is already defined.")
+        self.stages[name] = Stage(name, func, inputs, outputs, workdir, params)
+        return self.stages[name]
+
+    def _path(self, path):
+        return os.path.normpath(os.path.join(self.root, path))
+
+    def dependencies(self, stage):
+        """Names of stages producing an input of `stage`."""
+        dependencies = []
+        for other in self.stages.values():
+            if other is stage:
+                continue
+            outputs = [os.path.normpath(output) for output in other.outputs]
+            if any(os.path.normpath(path) == output or os.path.normpath(path).startswith(output + os.sep)
+                   for path in stage.inputs for output in outputs):
+                dependencies.append(other.name)
+        return dependencies
+
+    def order(self, targets=None):
+        """
+        Stages needed to build `targets` (stage names or prefixes like evaluation/ ; all stages if None),
+        each after the stages it depends on.
+        """
+        if targets is None:
+            selected = list(self.stages)
+        else:
+            selected = [name for name in self.stages if any(name == target or name.startswith(target) for target in targets)]
+            if not selected:
+                raise ValueError(f"No stages match {targets}. Choose from {list(self.stages)}.")
+        ordered = []
+        visiting = set()
+
+        def visit(name):
+            if name in ordered:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle through stage '{name}'.")
+            visiting.add(name)
+            for dependency in self.dependencies(self.stages[name]):
+                visit(dependency)
+            visiting.discard(name)
+            ordered.append(name)
+
+        for name in selected:
+            visit(name)
+        return ordered
+
+    def _signatures(self, stage, recorded):
+        """Current (mtime, size, sha256) of all input files, rehashing only files whose mtime or size changed."""
+        signatures = {}
+        for declared in stage.inputs:
+            for path in expand_files(self._path(declared)):
+                relative = os.path.relpath(path, self.root)
+                stat = os.stat(path)
+                previous = recorded.get(relative)
+                if previous is not None and previous[0] == stat.st_mtime and previous[1] == stat.st_size:
+                    signatures[relative] = previous
+                else:
+                    signatures[relative] = [stat.st_mtime, stat.st_size, file_digest(path)]
+        return signatures
+
+    def _record(self, stage, signatures):
+        return {'params': stage.params, 'inputs': signatures}
+
+    def outdated(self, stage):
+        """Reason why `stage` has to run, None if it is up to date."""
+        missing = [output for output in stage.outputs if not expand_files(self._path(output))]
+        if missing:
+            return f"missing output {missing[0]}"
+        for declared in stage.inputs:
+            if not os.path.exists(self._path(declared)):
+                return f"missing input {declared}"
+        recorded = self.state.get(stage.name)
+        if recorded is None:
+            # Never run by the pipeline: outputs built before are kept if they are newer than all inputs, like make
+            input_times = [os.path.getmtime(path) for declared in stage.inputs for path in expand_files(self._path(declared))]
+            output_times = [os.path.getmtime(path) for declared in stage.outputs for path in expand_files(self._path(declared))]
+            if max(input_times, default=0) > min(output_times):
+                return "outputs older than inputs"
+            self.state[stage.name] = self._record(stage, self._signatures(stage, {}))
+            return None
+        if 'inputs' not in recorded:
+            # State written before arguments were recorded
+            recorded = {'params': None, 'inputs': recorded}
+        # Round trip through JSON, so that tuples compare equal to the recorded lists
+        if json.loads(json.dumps(stage.params)) != recorded['params']:
+            return "arguments changed"
+        signatures = self._signatures(stage, recorded['inputs'])
+        if set(signatures) != set(recorded['inputs']):
+            return "input files added or removed"
+        for path, signature in signatures.items():
+            if signature[2] != recorded['inputs'][path][2]:
+                return f"changed {path}"
+        # Refresh timestamps of inputs rewritten with identical content, so they are not hashed again
+        self.state[stage.name] = self._record(stage, signatures)
+        return None
+
+    def _save_state(self):
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        with open(self.state_path + '.tmp', 'w') as f:
+            json.dump(self.state, f, indent=1, sort_keys=True)
+        os.replace(self.state_path + '.tmp', self.state_path)
+
+    def run(self, targets=None, force=False, dry_run=False):
+        """
+        Runs outdated stages needed for `targets` in dependency order, stops at the first failing stage.
+
+        Params:
+        targets (list): stage names or name prefixes, all stages if None.
+        force (bool): run every selected stage even if it is up to date.
+        dry_run (bool): only print which stages would run and why.
+
+        return: names of the stages that were run (or would run in a dry run).
+        """
+        executed = []
+        for name in self.order(targets):
+            stage = self.stages[name]
+            reason = "forced" if force else self.outdated(stage)
+            if reason is None and dry_run and any(dependency in executed for dependency in self.dependencies(stage)):
+                reason = "upstream stage outdated"
+            if reason is None:
+                print(f"[{name}] up to date")
+                continue
+            executed.append(name)
+            if dry_run:
+                print(f"[{name}] would run: {reason}")
+                continue
+            print(f"[{name}] running: {reason}")
+            start_time = time.time()
+            with working_directory(self._path(stage.workdir)):
+                stage.func()
+            self.state[name] = self._record(stage, self._signatures(stage, {}))
+            self._save_state()
+            print(f"[{name}] done in {time.time() - start_time:.2f} seconds")
+        if not dry_run:
+            self._save_state()
+        return executed
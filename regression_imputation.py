@@ -0,0 +1,191 @@
+import numpy as np
+import pandas as pd
+
+from correlation_engine import correlation_matrix
+
+
+def simple_regression_fits(x, y, train):
+    """
+    Least-squares slope and intercept of `y` on every predictor column of `x`, for many training sets at once,
+    computed in closed form from the sufficient statistics (weighted sums) of each training set.
+
+    Params:
+    x (np.ndarray): complete predictor values (rows x predictors).
+    y (np.ndarray): target values (rows), only used on training rows.
+    train (np.ndarray): boolean training masks (sets x rows), e.g. one per seed, True where the target is observed.
+
+    return: slopes and intercepts (sets x predictors), like LinearRegression fitted on each training set and predictor.
+    """
+    train = np.asarray(train, dtype=float)
+    # Centered around overall means, so that sums of squares keep their precision
+    x_mean = x.mean(axis=0)
+    y_mean = np.nanmean(y)
+    xc = x - x_mean
+    yc = np.where(np.isnan(y), 0.0, y - y_mean)
+
+    n = train.sum(axis=1)[:, None]
+    sum_x = train @ xc
+    sum_y = (train @ yc)[:, None]
+    sum_xx = train @ (xc ** 2)
+    sum_xy = train @ (xc * yc[:, None])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slopes = (sum_xy - sum_x * sum_y / n) / (sum_xx - sum_x ** 2 / n)
+        intercepts = sum_y / n - slopes * sum_x / n
+    # A constant predictor explains nothing, its fit is the mean of the training targets like LinearRegression
+    constant = ~np.isfinite(slopes)
+    slopes[constant] = 0.0
+    intercepts = np.where(constant, sum_y / n, intercepts)
+    # Back to the original scale of x and y
+    return slopes, intercepts + y_mean - slopes * x_mean
+
+
+def impute_simple_regression(x, y, missing):
+    """
+    Imputes missing values of target `y` from each predictor column of `x` separately, for many missingness masks at once.
+
+    Params:
+    x (np.ndarray): complete predictor values (rows x predictors).
+    y (np.ndarray): complete target values (rows).
+    missing (np.ndarray): boolean masks (sets x rows), True where the target was removed.
+
+    return: imputed target (sets x predictors x rows): observed values kept, removed values predicted by the simple regression
+    fitted on the observed rows of the same set.
+    """
+    missing = np.asarray(missing, dtype=bool)
+    slopes, intercepts = simple_regression_fits(x, y, ~missing)
+    predicted = intercepts[:, :, None] + slopes[:, :, None] * x.T[None, :, :]
+    return np.where(missing[:, None, :], predicted, y[None, None, :])
+
+
+def _ridge_coefficients(count, sums, gram, correlations, alpha):
+    """
+    Correlation-weighted ridge regression of the last column on the other columns, from sufficient statistics of
+    the training rows. Predictors are standardized and each one is penalized by `alpha` divided by the absolute
+    correlation with the target, so weakly correlated predictors are shrunk most. Leading axes are batched, e.g. seeds.
+
+    Params:
+    count (np.ndarray): number of training rows (...).
+    sums (np.ndarray): column sums over training rows (... x columns).
+    gram (np.ndarray): cross products of columns over training rows (... x columns x columns).
+    correlations (np.ndarray): correlation of every predictor with the target (predictors).
+    alpha (float): regularization strength.
+
+    return: coefficients of the predictors (... x predictors) and means of all columns (... x columns).
+    """
+    count = np.asarray(count, dtype=float)
+    mean = sums / count[..., None]
+    cov = gram / count[..., None, None] - mean[..., :, None] * mean[..., None, :]
+    std = np.sqrt(np.clip(np.diagonal(cov, axis1=-2, axis2=-1), 0.0, None))
+    corr = cov / (std[..., :, None] * std[..., None, :])
+    penalty = alpha / count[..., None] / np.abs(correlations)
+    lhs = corr[..., :-1, :-1] + np.eye(len(correlations)) * penalty[..., None, :]
+    beta = np.linalg.solve(lhs, corr[..., :-1, -1:])[..., 0]
+    return beta * std[..., -1:] / std[..., :-1], mean
+
+
+def impute_multiple_regression(x, y, missing, correlations, alpha=1.0):
+    """
+    Imputes missing values of target `y` from all predictor columns of `x` combined in one correlation-weighted ridge
+    regression, for many missingness masks at once. Sums and cross products of all rows are computed once and the
+    training statistics of each mask are derived by subtracting its removed rows, so the fits of all seeds share
+    the rows their training sets have in common.
+
+    Params:
+    x (np.ndarray): complete predictor values (rows x predictors).
+    y (np.ndarray): complete target values (rows).
+    missing (np.ndarray): boolean masks (sets x rows), True where the target was removed.
+    correlations (np.ndarray): correlation of every predictor with the target, e.g. from a CorrelationIndex.
+    alpha (float): regularization strength.
+
+    return: imputed target (sets x rows): observed values kept, removed values predicted.
+    """
+    missing = np.asarray(missing, dtype=bool)
+    data = np.column_stack([x, y])
+    # Shifted by overall means, so that cross products keep their precision
+    center = data.mean(axis=0)
+    centered = data - center
+    removed = missing.astype(float)
+    count = len(y) - removed.sum(axis=1)
+    sums = centered.sum(axis=0) - removed @ centered
+    gram = centered.T @ centered - np.einsum('sn,np,nq->spq', removed, centered, centered)
+    coefficients, mean = _ridge_coefficients(count, sums, gram, np.asarray(correlations, dtype=float), alpha)
+    # Prediction of every row from the fit of every set, back in the original scale
+    intercepts = mean[:, -1] - (mean[:, :-1] * coefficients).sum(axis=1) + center[-1]
+    predicted = intercepts[:, None] + coefficients @ centered[:, :-1].T
+    return np.where(missing, predicted, y[None, :])
+
+
+class RegressionStatistics:
+    """
+    Sums and cross products of the complete data of a combination, computed once and shared by all of its cells.
+    Training statistics of a cell are derived by subtracting the rows it does not train on.
+    """
+    def __init__(self, values):
+        self.values = np.asarray(values, dtype=float)
+        self.center = np.nanmean(self.values, axis=0)
+        # Missing values of the complete data contribute nothing, like rows excluded from training
+        self._centered = np.nan_to_num(self.values - self.center)
+        self.count = self.values.shape[0]
+        self.sums = self._centered.sum(axis=0)
+        self.gram = self._centered.T @ self._centered
+
+    def training_statistics(self, train, columns):
+        """Row count, sums and cross products of `columns` over the rows in `train`, relative to `center`."""
+        rows = self._centered[~train][:, columns]
+        return train.sum(), self.sums[columns] - rows.sum(axis=0), self.gram[np.ix_(columns, columns)] - rows.T @ rows
+
+
+def impute_correlation_regression(X, statistics=None, alpha=1.0, min_corr=0.5, max_p_value=0.05):
+    """
+    Imputes every column of X from the columns it is significantly correlated with (p-value below `max_p_value` and
+    absolute correlation above `min_corr`, like the correlation test) by one correlation-weighted ridge regression
+    per column, trained on rows where the column and all of its predictors are observed. Predictors missing in a row
+    to impute count with their mean. Columns without significant predictors are imputed with their mean.
+
+    Params:
+    X (np.ndarray): data (rows x features) with NaN for missing values.
+    statistics (RegressionStatistics): statistics of the complete data X was masked from. If given, training statistics
+    are derived from it instead of recomputed. Predictors are always selected on the observed values of X.
+    alpha (float): regularization strength.
+    min_corr (float): minimum absolute correlation of a predictor.
+    max_p_value (float): maximum p-value of the correlation of a predictor.
+
+    return: new array with missing values imputed.
+    """
+    missing = np.isnan(X)
+    imputed = X.copy()
+    corr, p_values, _ = (frame.to_numpy() for frame in correlation_matrix(pd.DataFrame(X)))
+
+    for c in np.flatnonzero(missing.any(axis=0)):
+        rows = missing[:, c]
+        predictors = [j for j in range(X.shape[1]) if j != c and p_values[c, j] < max_p_value and abs(corr[c, j]) > min_corr]
+        columns = predictors + [c]
+        train = ~missing[:, columns].any(axis=1)
+        if not predictors or train.sum() <= len(predictors):
+            imputed[rows, c] = np.nanmean(X[:, c])
+            continue
+
+        if statistics is not None:
+            center = statistics.center[columns]
+            count, sums, gram = statistics.training_statistics(train, columns)
+        else:
+            center = np.nanmean(X[:, columns], axis=0)
+            centered = X[train][:, columns] - center
+            count, sums, gram = train.sum(), centered.sum(axis=0), centered.T @ centered
+        coefficients, mean = _ridge_coefficients(count, sums, gram, corr[c, predictors], alpha)
+
+        mean = mean + center
+        values = np.where(missing[rows][:, predictors], mean[:-1], X[rows][:, predictors])
+        imputed[rows, c] = mean[-1] + (values - mean[:-1]) @ coefficients
+    return imputed
+
+
+# Regression statistics built in the current process, keyed by name of the complete data (e.g. dataset/combination)
+_shared_statistics = {}
+
+
+def shared_statistics(name, values):
+    """Returns regression statistics of the complete data `values` registered under `name`, building them once per process."""
+    if name not in _shared_statistics:
+        _shared_statistics[name] = RegressionStatistics(values)
+    return _shared_statistics[name]
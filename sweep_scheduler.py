@@ -0,0 +1,45 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from threadpoolctl import threadpool_limits
+
+# Environment variables read by BLAS/OpenMP runtimes when they are loaded in a fresh worker
+THREAD_ENV_VARS = ['OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS']
+
+# Keeps thread limits of a worker process active for its whole lifetime
+_worker_limits = None
+
+
+def _init_worker(blas_threads):
+    """Limits BLAS/OpenMP threads of a worker process so that workers do not oversubscribe the cores."""
+    global _worker_limits
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(blas_threads)
+    _worker_limits = threadpool_limits(limits=blas_threads)
+
+
+def run_tasks(func, tasks, workers=1, blas_threads=1):
+    """
+    Runs `func(*task)` for every task and yields `(task, result)` pairs as tasks complete.
+
+    Params:
+    func: module level function executed for each task, must be picklable.
+    tasks (list): argument tuples, enumerated up front.
+    workers (int): number of worker processes. With 1 tasks run sequentially in current process.
+    blas_threads (int): BLAS/OpenMP threads allowed per worker.
+
+    If a task fails or the consumer stops early, tasks not yet started are cancelled instead of being run
+    to completion, and the error surfaces after the tasks already running finish.
+    """
+    if workers <= 1:
+        with threadpool_limits(limits=blas_threads):
+            for task in tasks:
+                yield task, func(*task)
+        return
+
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(blas_threads,))
+    try:
+        futures = {executor.submit(func, *task): task for task in tasks}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,119 @@
+import ast
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import numpy as np
+import pandas as pd
+import sklearn
+
+
+def library_versions():
+    return {'numpy': np.__version__, 'pandas': pd.__version__, 'sklearn': sklearn.__version__}
+
+
+# Project root, source files below it are hashed into the implementation of an imputer
+project_root = os.path.dirname(os.path.abspath(__file__))
+
+
+def project_modules(path):
+    """
+    Source files of the project script or module at `path` and, recursively, of every project module it imports
+    (imports inside functions included). Imports are read from the source, so scripts are not executed, and resolved
+    on sys.path like the imports themselves. Installed libraries are skipped.
+
+    return: sorted absolute paths of the source files.
+    """
+    pending = [os.path.abspath(path)]
+    paths = set()
+    while pending:
+        path = pending.pop()
+        if path in paths:
+            continue
+        paths.add(path)
+        with open(path) as file:
+            tree = ast.parse(file.read(), path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.level == 0:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                try:
+                    spec = importlib.util.find_spec(name.split('.')[0])
+                except (ImportError, ValueError):
+                    spec = None
+                origin = getattr(spec, 'origin', None)
+                if origin and origin.endswith('.py') and os.path.abspath(origin).startswith(project_root + os.sep):
+                    pending.append(os.path.abspath(origin))
+    return sorted(paths)
+
+
+def source_digest(obj):
+    """
+    Hash of the implementation of `obj` (e.g. an imputer class): the source of the project module defining it and
+    of every project module it imports, see `project_modules`. Installed libraries are covered by library_versions.
+
+    return: hex sha256 over relative paths and contents of the source files.
+    """
+    digest = hashlib.sha256()
+    for path in project_modules(inspect.getsourcefile(obj)):
+        digest.update(os.path.relpath(path, project_root).encode())
+        with open(path, 'rb') as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def task_digest(df, algorithm, params, code=None):
+    """
+    Content hash of one imputation task. Results computed with other code of the imputer get another digest, as long
+    as `code` is given; `--no-cache` of impute_algo_all_dataset recomputes every task regardless of the cache.
+
+    Params:
+    df (pd.DataFrame): input data of the task, missing cells as NaN.
+    algorithm (str): algorithm name.
+    params (dict): hyperparameters of the algorithm.
+    code (str): digest of the implementation of the algorithm, see `source_digest`.
+
+    return: hex sha256 over data bytes, missing mask, column names, algorithm, parameters, implementation and library versions.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([list(map(str, df.columns)), algorithm, params, code, library_versions()], sort_keys=True, default=str).encode())
+    for column in df.columns:
+        values = df[column].to_numpy()
+        if values.dtype.kind == 'f':
+            digest.update(np.ascontiguousarray(values).tobytes())
+            digest.update(np.packbits(np.isnan(values)).tobytes())
+        else:
+            digest.update('\x1f'.join(map(str, values)).encode())
+    return digest.hexdigest()
+
+
+class TaskCache:
+    """
+    Content-addressed on-disk cache of imputation results. Entries are keyed by `task_digest`, so a result is reused
+    as long as input data, mask, algorithm, parameters, imputer source code and library versions are unchanged.
+    """
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def path(self, digest):
+        return os.path.join(self.cache_dir, digest[:2], f'{digest}.pkl')
+
+    def get(self, digest):
+        """Returns cached DataFrame or None if the task was not computed yet."""
+        path = self.path(digest)
+        if os.path.exists(path):
+            return pd.read_pickle(path)
+        return None
+
+    def put(self, digest, df):
+        path = self.path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to temporary file first so an interrupted run never leaves a truncated entry
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, path)